@@ -4,13 +4,15 @@ Users can add, list, and delete their Scopus API keys
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db import get_db, User, ApiKey
+from app.db import get_async_db, User, ApiKey
 from app.schemas.auth import ApiKeyCreate, ApiKeyResponse
 from app.core.dependencies import get_current_user
 from app.core.security import encrypt_api_key, decrypt_api_key
+from app.core.key_cache import api_key_cache
 
 router = APIRouter(prefix="/api/keys", tags=["api-keys"])
 
@@ -18,7 +20,7 @@ router = APIRouter(prefix="/api/keys", tags=["api-keys"])
 @router.post("/", response_model=ApiKeyResponse, status_code=status.HTTP_201_CREATED)
 async def create_api_key(
     key_data: ApiKeyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -34,37 +36,38 @@ async def create_api_key(
     )
     
     db.add(new_key)
-    db.commit()
-    db.refresh(new_key)
+    await db.commit()
+    await db.refresh(new_key)
+    api_key_cache.invalidate(current_user.id)
     
     return new_key
 
 
 @router.get("/", response_model=List[ApiKeyResponse])
 async def get_user_api_keys(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all API keys for the current user
     """
-    keys = db.query(ApiKey).filter(ApiKey.user_id == current_user.id).all()
+    keys = (await db.execute(select(ApiKey).where(ApiKey.user_id == current_user.id))).scalars().all()
     return keys
 
 
 @router.get("/active")
 async def get_active_api_key(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get the first active API key (decrypted) for making Scopus API calls
     Returns None if no active key found
     """
-    key = db.query(ApiKey).filter(
+    key = (await db.execute(select(ApiKey).where(
         ApiKey.user_id == current_user.id,
         ApiKey.is_active == True
-    ).first()
+    ))).scalars().first()
     
     if not key:
         return {"api_key": None, "message": "No active API key found. Please add one."}
@@ -80,16 +83,16 @@ async def get_active_api_key(
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_api_key(
     key_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete an API key
     """
-    key = db.query(ApiKey).filter(
+    key = (await db.execute(select(ApiKey).where(
         ApiKey.id == key_id,
         ApiKey.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not key:
         raise HTTPException(
@@ -97,8 +100,9 @@ async def delete_api_key(
             detail="API key not found"
         )
     
-    db.delete(key)
-    db.commit()
+    await db.delete(key)
+    await db.commit()
+    api_key_cache.invalidate(current_user.id)
     
     return None
 
@@ -106,16 +110,16 @@ async def delete_api_key(
 @router.patch("/{key_id}/toggle", response_model=ApiKeyResponse)
 async def toggle_api_key(
     key_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Toggle API key active status
     """
-    key = db.query(ApiKey).filter(
+    key = (await db.execute(select(ApiKey).where(
         ApiKey.id == key_id,
         ApiKey.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not key:
         raise HTTPException(
@@ -124,7 +128,8 @@ async def toggle_api_key(
         )
     
     key.is_active = not key.is_active
-    db.commit()
-    db.refresh(key)
+    await db.commit()
+    await db.refresh(key)
+    api_key_cache.invalidate(current_user.id)
     
     return key
@@ -3,12 +3,13 @@ Authentication API routes - Register, Login
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from app.db import get_db, User
+from app.db import get_async_db, User
 from app.schemas.auth import UserCreate, UserLogin, Token, UserResponse
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import get_password_hash_async, verify_and_update_password_async, create_access_token
 from app.core.config import settings
 from app.core.dependencies import get_current_user
 
@@ -16,12 +17,12 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register new user with email and password
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,26 +30,26 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password, returns JWT token
     """
     # Find user
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,14 +57,20 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    if not verify_password(user_data.password, user.hashed_password):
+    # Verify password (off the event loop)
+    valid, new_hash = await verify_and_update_password_async(user_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with other cost parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Check if user is active
     if not user.is_active:
         raise HTTPException(
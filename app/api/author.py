@@ -2,9 +2,11 @@
 Author and Affiliation API routes
 """
 
-from fastapi import APIRouter, Path, Query, HTTPException
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from app.services import scopus_service
+from app.core.dependencies import get_user_scopus_service
+from app.services.scopus_service import ScopusService
 
 router = APIRouter(prefix="/api", tags=["author"])
 
@@ -12,10 +14,11 @@ router = APIRouter(prefix="/api", tags=["author"])
 @router.get("/author/{author_name}")
 async def search_by_author(
     author_name: str = Path(..., description="Author name"),
-    limit: int = Query(25, ge=1, le=100, description="Result limit")
+    limit: int = Query(25, ge=1, le=100, description="Result limit"),
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """Search papers by author name"""
-    papers = scopus_service.search_by_author(author_name, limit)
+    papers = await run_in_threadpool(user_scopus_service.search_by_author, author_name, limit)
     
     return {
         "author": author_name,
@@ -27,10 +30,11 @@ async def search_by_author(
 @router.get("/affiliation/{institution}")
 async def search_by_affiliation(
     institution: str = Path(..., description="Institution/University name"),
-    limit: int = Query(25, ge=1, le=100, description="Result limit")
+    limit: int = Query(25, ge=1, le=100, description="Result limit"),
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """Search papers by institution/affiliation"""
-    papers = scopus_service.search_by_affiliation(institution, limit)
+    papers = await run_in_threadpool(user_scopus_service.search_by_affiliation, institution, limit)
     
     return {
         "institution": institution,
@@ -2,8 +2,9 @@
 Debug endpoint untuk test API key flow
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.db.models import User, ApiKey
 from app.core.dependencies import get_current_user
 from app.core.security import decrypt_api_key
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/api/debug", tags=["debug"])
 @router.get("/test-flow")
 async def test_api_key_flow(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Debug endpoint to test full API key flow"""
     
@@ -24,10 +25,10 @@ async def test_api_key_flow(
     }
     
     # Get API key from database
-    api_key = db.query(ApiKey).filter(
+    api_key = (await db.execute(select(ApiKey).where(
         ApiKey.user_id == current_user.id,
         ApiKey.is_active == True
-    ).first()
+    ))).scalars().first()
     
     if not api_key:
         return {**result, "error": "No active API key found"}
@@ -2,75 +2,161 @@
 Export API routes
 """
 
-from fastapi import APIRouter, HTTPException
+import itertools
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, StreamingResponse
-import pandas as pd
-import io
 from datetime import datetime
 
 from app.schemas import SearchRequest, ExportFormat
-from app.services import scopus_service
+from app.core.dependencies import get_current_user, get_user_scopus_service
+from app.db.models import User
+from app.services.scopus_service import ScopusService
+from app.services.export_service import STREAM_WRITERS, columnar_available, iter_paper_pages, write_xlsx
+from app.services.resultset_service import result_set_store
+from app.services.artifact_store import artifact_headers, artifact_response, artifact_store
 
 router = APIRouter(prefix="/api", tags=["export"])
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+ARTIFACT_MEDIA_TYPES = {extension: media_type for _, media_type, extension in STREAM_WRITERS.values()}
+ARTIFACT_MEDIA_TYPES["xlsx"] = XLSX_MEDIA_TYPE
+
+
+def _artifact_location(artifact_key: str, extension: str) -> str:
+    return f"{router.prefix}/export/artifacts/{artifact_key}.{extension}"
+
 
 @router.post("/export/{format}")
 async def export_results(
     format: ExportFormat,
-    request: SearchRequest
+    http_request: Request,
+    request: Optional[SearchRequest] = None,
+    result_set_id: Optional[str] = Query(None, description="Export a result set from /api/search instead of re-running the search"),
+    current_user: User = Depends(get_current_user),
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """
     Export hasil search ke berbagai format
     
     - **json**: JSON file
-    - **csv**: CSV file
-    - **excel**: Excel file (.xlsx)
-    """
-    # Use service to search
-    papers, _, _ = scopus_service.search_papers(
-        query=request.query,
-        limit=request.limit,
-        year_from=request.year_from,
-        year_to=request.year_to,
-        document_type=request.document_type.value if request.document_type else None,
-        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
-        sort_by=request.sort_by.value
-    )
+    - **csv**: CSV file, streamed as Scopus pages arrive
+    - **excel**: Excel file (.xlsx), built in a temp file off the event loop
+    - **parquet**: Parquet file, one row group per Scopus page (requires pyarrow)
+    - **arrow**: Arrow IPC stream, one record batch per Scopus page (requires pyarrow)
+    - **bibtex**, **ris**, **csl-json**: citation manager formats (Zotero, Mendeley, EndNote)
     
-    if not papers:
-        raise HTTPException(status_code=404, detail="No papers found")
+    With `result_set_id` the papers already fetched by `/api/search` are
+    exported without calling Scopus. If the set has expired, the search in
+    the request body (when given) is run again instead.
     
-    df = pd.DataFrame(papers)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    Finished file exports are kept on disk for a while: repeating the same
+    export is served without calling Scopus. Every file response carries an
+    `ETag` and a `Content-Location` pointing at `GET /api/export/artifacts/...`,
+    which supports `Range`, `If-Range` and `If-None-Match`, so an interrupted
+    download (even the first, streamed one) can be resumed there.
+    """
+    if format in (ExportFormat.parquet, ExportFormat.arrow) and not columnar_available():
+        raise HTTPException(status_code=501, detail="Parquet and Arrow exports require pyarrow to be installed")
     
-    if format == ExportFormat.json:
-        # Export as JSON
-        return JSONResponse(content=papers)
+    filename_base = f"scopus_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
-    elif format == ExportFormat.csv:
-        # Export as CSV
-        output = io.StringIO()
-        df.to_csv(output, index=False, encoding='utf-8-sig')
-        output.seek(0)
-        
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=scopus_results_{timestamp}.csv"
-            }
+    pages = None
+    if result_set_id:
+        result_set = result_set_store.get(result_set_id, current_user.id)
+        if result_set is not None:
+            artifact_key = artifact_store.key(user_id=current_user.id, result_set=result_set.id, format=format.value)
+            pages = result_set.iter_pages()
+        elif request is None:
+            raise HTTPException(status_code=404, detail="Result set not found or expired")
+    
+    if pages is None:
+        if request is None:
+            raise HTTPException(status_code=400, detail="Either a search request or result_set_id is required")
+        full_query = user_scopus_service.build_query(
+            query=request.query,
+            year_from=request.year_from,
+            year_to=request.year_to,
+            document_type=request.document_type.value if request.document_type else None,
+            subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None
         )
+        artifact_key = artifact_store.key(
+            user_id=current_user.id,
+            query=full_query, limit=request.limit, sort_by=request.sort_by.value, format=format.value
+        )
+        pages = iter_paper_pages(user_scopus_service, full_query, request.limit, request.sort_by.value)
+    
+    writer = STREAM_WRITERS.get(format.value)
+    if writer is not None:
+        media_type, extension = writer[1], writer[2]
+    else:
+        media_type, extension = XLSX_MEDIA_TYPE, "xlsx"
+    
+    # A finished export of the same search is served from disk (with Range/ETag)
+    filename = f"{filename_base}.{extension}"
+    location = _artifact_location(artifact_key, extension)
+    if format != ExportFormat.json:
+        artifact = artifact_store.get(artifact_key, current_user.id)
+        if artifact is not None:
+            pages.close()
+            return artifact_response(http_request, artifact, media_type, filename, location)
     
-    elif format == ExportFormat.excel:
-        # Export as Excel
-        output = io.BytesIO()
-        df.to_excel(output, index=False, engine='openpyxl')
-        output.seek(0)
-        
+    # Fetch the first page before responding so failures keep their status code
+    first_page = await run_in_threadpool(next, pages, None)
+    if not first_page:
+        raise HTTPException(status_code=404, detail="No papers found")
+    
+    pages = itertools.chain([first_page], pages)
+    
+    if writer is not None:
+        # Written page by page from Starlette's threadpool and kept on disk once complete
+        build = artifact_store.begin(artifact_key, current_user.id)
         return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=scopus_results_{timestamp}.xlsx"
-            }
+            artifact_store.tee(build, writer[0](pages)),
+            media_type=media_type,
+            headers=artifact_headers(build.etag, filename, location)
         )
+    
+    if format == ExportFormat.excel:
+        # Build the workbook in the threadpool, then serve it from the artifact store
+        build = artifact_store.begin(artifact_key, current_user.id)
+        try:
+            await run_in_threadpool(write_xlsx, pages, build.temp_path)
+            artifact = artifact_store.commit(build)
+        except BaseException:
+            artifact_store.discard(build)
+            raise
+        return artifact_response(http_request, artifact, media_type, filename, location)
+    
+    # Export as JSON
+    papers = await run_in_threadpool(lambda: list(itertools.chain.from_iterable(pages)))
+    return JSONResponse(content=papers)
+
+
+@router.get("/export/artifacts/{name}")
+async def download_export_artifact(
+    name: str,
+    http_request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download a finished export by the name given in its `Content-Location`
+    
+    Supports `Range`, `If-Range` and `If-None-Match`, so download managers
+    can resume an interrupted export with a plain GET. Only the caller's own
+    exports can be downloaded.
+    """
+    artifact_key, _, extension = name.rpartition(".")
+    media_type = ARTIFACT_MEDIA_TYPES.get(extension)
+    artifact = artifact_store.get(artifact_key, current_user.id) if media_type and artifact_key else None
+    if artifact is None:
+        if media_type and artifact_key and artifact_store.building(artifact_key, current_user.id):
+            raise HTTPException(
+                status_code=503,
+                detail="Export is still being prepared",
+                headers={"Retry-After": "5"}
+            )
+        raise HTTPException(status_code=404, detail="Export not found or expired")
+    return artifact_response(http_request, artifact, media_type, name)
@@ -7,6 +7,7 @@ from datetime import datetime
 
 from app.core.config import settings
 from app.services import scopus_service
+from app.services.hedging import hedge_stats
 
 router = APIRouter(tags=["health"])
 
@@ -24,6 +25,7 @@ async def health_check():
     return {
         "status": "healthy",
         "scopus_api": api_status,
+        "scopus_hedging": hedge_stats.snapshot(),
         "timestamp": datetime.now().isoformat(),
         "version": settings.app_version
     }
@@ -39,6 +41,10 @@ async def api_info():
         "endpoints": {
             "web_interface": "/",
             "search": "/api/search",
+            "search_stream": "/api/search/stream",
+            "search_batch": "/api/search/batch",
+            "jobs": "/api/jobs",
+            "results": "/api/results/{id}/query",
             "quick_search": "/api/quick-search",
             "stats": "/api/stats",
             "export": "/api/export/{format}",
@@ -0,0 +1,170 @@
+"""
+Background job API routes
+Bulk searches and harvests that outlive a single HTTP request
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.dependencies import get_current_user, get_user_scopus_service
+from app.core.security import encrypt_api_key
+from app.db.models import User
+from app.schemas import JobRequest, JobResponse, StatsResponse
+from app.services.job_service import TERMINAL_STATUSES, job_manager
+from app.services.scopus_service import ScopusService
+from app.services.stats_engine import StatsAccumulator
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _get_job_or_404(job_id: str, current_user: User) -> dict:
+    job = job_manager.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: JobRequest,
+    current_user: User = Depends(get_current_user),
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
+):
+    """
+    Submit a bulk search or harvest, returns immediately with the job id
+
+    - **search**: offset paging, capped at Scopus' 5000-result window
+    - **harvest**: cursor paging for anything deeper
+
+    Poll `/api/jobs/{id}` or stream `/api/jobs/{id}/events` for progress.
+    """
+    full_query = user_scopus_service.build_query(
+        query=request.query,
+        year_from=request.year_from,
+        year_to=request.year_to,
+        document_type=request.document_type.value if request.document_type else None,
+        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None
+    )
+
+    # Only the encrypted key is stored with the job
+    return job_manager.submit(
+        user_id=current_user.id,
+        kind=request.kind,
+        query=full_query,
+        limit=request.limit,
+        sort_by=request.sort_by.value,
+        encrypted_api_key=encrypt_api_key(user_scopus_service.api_key)
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get job status and progress
+    """
+    return _get_job_or_404(job_id, current_user)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream job progress as Server-Sent Events until the job finishes
+    """
+    _get_job_or_404(job_id, current_user)
+
+    async def events():
+        last_update = None
+        while True:
+            job = job_manager.get(job_id, current_user.id)
+            if job is None:
+                break
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                payload = JobResponse(**job).model_dump_json()
+                yield f"event: progress\ndata: {payload}\n\n"
+            if job["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(settings.job_poll_interval)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    chunk: int = Query(None, ge=0, description="Return a single result chunk instead of streaming all"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get job results written so far
+
+    Without `chunk`, every stored chunk is streamed as NDJSON (one paper per line).
+    Results are available while the job is still running.
+    """
+    job = _get_job_or_404(job_id, current_user)
+
+    if chunk is not None:
+        if chunk >= job["chunks"]:
+            raise HTTPException(status_code=404, detail="Result chunk not found")
+        papers = job_manager.read_chunk(job, chunk)
+        if papers is None:
+            raise HTTPException(status_code=410, detail="Result chunk expired")
+        return {"job_id": job_id, "chunk": chunk, "chunks": job["chunks"], "papers": papers}
+
+    def lines():
+        for papers in job_manager.iter_results(job):
+            yield "".join(json.dumps(paper) + "\n" for paper in papers)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/{job_id}/stats", response_model=StatsResponse)
+async def get_job_stats(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Citation, year and venue statistics over the job results written so far
+    """
+    job = _get_job_or_404(job_id, current_user)
+
+    def accumulate() -> StatsAccumulator:
+        stats = StatsAccumulator()
+        for papers in job_manager.iter_results(job):
+            stats.update(papers)
+        return stats
+
+    stats = await run_in_threadpool(accumulate)
+    if not stats.count:
+        raise HTTPException(status_code=404, detail="No results yet")
+    return StatsResponse(**stats.summary(), total_available=job["total_available"])
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cancel a job - results fetched before cancellation are kept
+    """
+    job = _get_job_or_404(job_id, current_user)
+    return job_manager.cancel(job)
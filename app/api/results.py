@@ -0,0 +1,81 @@
+"""
+Result set API routes
+Re-sort, filter, facet and page a previous search without calling Scopus
+"""
+
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.dependencies import get_current_user
+from app.db.models import User
+from app.schemas import ResultSetQuery, ResultSetResponse
+from app.services.resultset_service import ResultSet, result_set_store
+
+router = APIRouter(prefix="/api/results", tags=["results"])
+
+
+def _get_result_set_or_404(result_set_id: str, current_user: User) -> ResultSet:
+    result_set = result_set_store.get(result_set_id, current_user.id)
+    if result_set is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Result set not found or expired"
+        )
+    return result_set
+
+
+@router.post("/{result_set_id}/query", response_model=ResultSetResponse)
+async def query_result_set(
+    result_set_id: str,
+    request: ResultSetQuery,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Query the papers of a previous search locally
+
+    Use the `result_set_id` returned by `/api/search`. Filters, sorting,
+    facets and paging are applied in memory; Scopus is not called.
+    """
+    result_set = _get_result_set_or_404(result_set_id, current_user)
+
+    rows = result_set.select(
+        year_from=request.year_from,
+        year_to=request.year_to,
+        min_citations=request.min_citations,
+        document_type=request.document_type.value if request.document_type else None,
+        open_access=request.open_access,
+        publication=request.publication
+    )
+    if request.sort_by is not None:
+        rows = result_set.sort(rows, request.sort_by.value)
+
+    total_pages = max(1, math.ceil(len(rows) / request.per_page))
+    page = min(request.page, total_pages)
+    offset = (page - 1) * request.per_page
+
+    return ResultSetResponse(
+        result_set_id=result_set.id,
+        query=result_set.query,
+        total_available=result_set.total_available,
+        materialized=len(result_set),
+        matched=len(rows),
+        page=page,
+        per_page=request.per_page,
+        total_pages=total_pages,
+        papers=list(result_set.iter_rows(rows[offset:offset + request.per_page])),
+        facets=result_set.facets(rows, [field.value for field in request.facets])
+    )
+
+
+@router.delete("/{result_set_id}")
+async def delete_result_set(
+    result_set_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Discard a result set before it expires
+    """
+    _get_result_set_or_404(result_set_id, current_user)
+    result_set_store.delete(result_set_id)
+    return {"message": "Result set deleted"}
@@ -2,27 +2,75 @@
 Search API routes
 """
 
+import asyncio
+import hashlib
+import itertools
+import json
 import math
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from app.schemas import SearchRequest, SearchResponse, QuickSearchResponse, SortBy
-from app.db.database import get_db
-from app.db.models import User, ApiKey
-from app.core.dependencies import get_current_user
-from app.core.security import decrypt_api_key
+from app.schemas import (
+    SearchRequest,
+    SearchResponse,
+    QuickSearchResponse,
+    SortBy,
+    StreamFormat,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    BatchQueryResult,
+)
+from app.db.models import User
+from app.core.dependencies import get_current_user, get_user_scopus_service
+from app.core.config import settings
+from app.core.security import create_resume_token, decode_resume_token
+from app.services.scopus_service import ScopusService, PartialSearchResults
+from app.services.prefetch_service import prefetch_manager
+from app.services.redis_service import redis_cache
+from app.services.resultset_service import result_set_store
 
 router = APIRouter(prefix="/api", tags=["search"])
 
 
+def _page_cache_key(search_kwargs: dict, page: int) -> str:
+    """Cache key of one page of a search, as written by ScopusService.search_papers"""
+    filters = ScopusService.cache_filters(
+        search_kwargs["year_from"],
+        search_kwargs["year_to"],
+        search_kwargs["document_type"],
+        search_kwargs["subject_areas"],
+        search_kwargs["sort_by"],
+        page
+    )
+    return redis_cache.search_cache_key(search_kwargs["query"], search_kwargs["limit"], filters)
+
+
+def _paper_identity(paper: dict) -> str:
+    """Deduplication key for a parsed paper"""
+    for field in ("eid", "doi"):
+        value = paper.get(field)
+        if value and value != "N/A":
+            return f"{field}:{value}"
+    return f"title:{paper.get('title', '').strip().lower()}"
+
+
+def _search_fingerprint(search_kwargs: dict, page: int) -> str:
+    """Identifies the search window a resume token belongs to"""
+    params = json.dumps({**search_kwargs, "page": page}, sort_keys=True)
+    return hashlib.sha256(params.encode()).hexdigest()[:16]
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search_papers(
     request: SearchRequest,
+    materialize: bool = Query(False, description="Keep the papers as a result set for /api/results, exports and highly-cited"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """
     Search papers dengan filter lengkap dan limit control
@@ -34,41 +82,62 @@ async def search_papers(
     - **document_type**: Tipe dokumen (article, conference, dll)
     - **subject_areas**: Area subjek (computer_science, medicine, dll)
     - **sort_by**: Urutan hasil (citations, date, relevance)
+    - **materialize** (query): also keep the page server-side and return its `result_set_id`
     """
     start_time = datetime.now()
+    # Taken up front so waiting on a prefetch counts against it too
+    deadline = time.monotonic() + settings.search_deadline
     
-    # Get user's active API key
-    api_key = db.query(ApiKey).filter(
-        ApiKey.user_id == current_user.id,
-        ApiKey.is_active == True
-    ).first()
+    search_kwargs = dict(
+        query=request.query,
+        limit=request.limit,
+        year_from=request.year_from,
+        year_to=request.year_to,
+        document_type=request.document_type.value if request.document_type else None,
+        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
+        sort_by=request.sort_by.value
+    )
     
-    if not api_key:
-        raise HTTPException(
-            status_code=403,
-            detail="No active Scopus API key found. Please add an API key first."
-        )
+    # Resuming a partial page continues from where the deadline cut it
+    fingerprint = _search_fingerprint(search_kwargs, request.page)
+    offset = None
+    if request.resume_token:
+        resume = decode_resume_token(request.resume_token)
+        if resume is None or resume.get("fp") != fingerprint:
+            raise HTTPException(status_code=400, detail="Invalid or expired resume token")
+        offset = resume["start"]
+        search_kwargs["limit"] = resume["remaining"]
+    else:
+        # Wait for a prefetch of this exact page; cancel one for any other page
+        inflight = prefetch_manager.claim(current_user.id, _page_cache_key(search_kwargs, request.page))
+        if inflight is not None:
+            try:
+                await asyncio.wait_for(
+                    asyncio.wrap_future(inflight),
+                    timeout=max(0.0, min(user_scopus_service.timeout, deadline - time.monotonic()))
+                )
+            except asyncio.TimeoutError:
+                pass
     
-    # Decrypt API key before use
-    decrypted_key = decrypt_api_key(api_key.api_key)
+    partial: Optional[PartialSearchResults] = None
     
-    # Create ScopusService instance with user's API key
-    from app.services.scopus_service import ScopusService
-    user_scopus_service = ScopusService(decrypted_key)
+    def run_search(page: int) -> tuple[list, str, int]:
+        nonlocal partial
+        try:
+            return user_scopus_service.search_papers(
+                **search_kwargs,
+                page=page,
+                use_cache=True,  # Prefetched pages are served from the cache
+                deadline=deadline,
+                offset=offset
+            )
+        except PartialSearchResults as exc:
+            partial = exc
+            return exc.papers, exc.query, exc.total_available
     
-    # Use service to search
+    # Use service to search (rate limit waits and hedging block, keep them off the event loop)
     try:
-        papers, full_query, total_available = user_scopus_service.search_papers(
-            query=request.query,
-            limit=request.limit,
-            year_from=request.year_from,
-            year_to=request.year_to,
-            document_type=request.document_type.value if request.document_type else None,
-            subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
-            sort_by=request.sort_by.value,
-            page=request.page,
-            use_cache=False  # Disable caching to avoid Redis issues
-        )
+        papers, full_query, total_available = await run_in_threadpool(run_search, request.page)
     except HTTPException:
         # Re-raise HTTPException as is
         raise
@@ -79,25 +148,51 @@ async def search_papers(
             detail=f"Search failed: {str(e)}"
         )
     
-    execution_time = (datetime.now() - start_time).total_seconds()
-
     total_pages = max(1, math.ceil(total_available / request.limit)) if request.limit else 1
     current_page = min(max(1, request.page), total_pages)
 
-    if current_page != request.page and total_available > 0:
-        papers, full_query, total_available = user_scopus_service.search_papers(
-            query=request.query,
-            limit=request.limit,
-            year_from=request.year_from,
-            year_to=request.year_to,
-            document_type=request.document_type.value if request.document_type else None,
-            subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
-            sort_by=request.sort_by.value,
-            page=current_page,
-            use_cache=False
-        )
+    if current_page != request.page and total_available > 0 and offset is None:
+        partial = None
+        papers, full_query, total_available = await run_in_threadpool(run_search, current_page)
         total_pages = max(1, math.ceil(total_available / request.limit)) if request.limit else 1
     
+    execution_time = (datetime.now() - start_time).total_seconds()
+    
+    resume_token = None
+    if partial is not None:
+        window_end = (offset if offset is not None else (current_page - 1) * request.limit) + search_kwargs["limit"]
+        resume_token = create_resume_token(
+            {
+                # Same page as the check above, so resending the request as-is matches
+                "fp": _search_fingerprint(search_kwargs | {"limit": request.limit}, request.page),
+                "start": partial.next_start,
+                "remaining": max(1, window_end - partial.next_start)
+            },
+            timedelta(seconds=settings.redis_cache_ttl)
+        )
+    
+    # Speculatively fetch the next page into the cache
+    next_page = current_page + 1
+    if next_page <= total_pages and partial is None and offset is None:
+        next_key = _page_cache_key(search_kwargs, next_page)
+        if not redis_cache.exists(next_key):
+            prefetch_manager.schedule(
+                current_user.id,
+                next_key,
+                lambda cancel_event: user_scopus_service.search_papers(
+                    **search_kwargs,
+                    page=next_page,
+                    use_cache=True,
+                    cancel_event=cancel_event
+                )
+            )
+    
+    # Materialize the papers so they can be re-sorted/filtered via /api/results (opt-in,
+    # plain page views shouldn't each park a copy of their papers)
+    result_set_id = None
+    if materialize:
+        result_set_id = result_set_store.create(current_user.id, full_query, total_available, papers).id
+    
     return SearchResponse(
         total_available=total_available,
         returned_count=len(papers),
@@ -106,7 +201,168 @@ async def search_papers(
         total_pages=total_pages,
         query=full_query,
         papers=papers,
-        execution_time=execution_time
+        execution_time=execution_time,
+        partial=partial is not None,
+        resume_token=resume_token,
+        result_set_id=result_set_id
+    )
+
+
+@router.post("/search/stream")
+async def stream_search_papers(
+    request: SearchRequest,
+    format: StreamFormat = Query(StreamFormat.ndjson, description="ndjson or sse"),
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
+):
+    """
+    Streaming variant of /api/search - papers are sent as each Scopus page arrives
+    
+    Every frame is a JSON object with a `type`:
+    - **paper**: one parsed paper
+    - **error**: upstream failure after some papers were sent
+    - **summary**: last frame with totals and timing
+    
+    `format=ndjson` sends one frame per line, `format=sse` sends Server-Sent Events.
+    """
+    start_time = time.monotonic()
+    full_query = user_scopus_service.build_query(
+        query=request.query,
+        year_from=request.year_from,
+        year_to=request.year_to,
+        document_type=request.document_type.value if request.document_type else None,
+        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None
+    )
+    
+    if format == StreamFormat.sse:
+        def encode(frame: dict) -> str:
+            return f"event: {frame['type']}\ndata: {json.dumps(frame)}\n\n"
+        media_type = "text/event-stream"
+    else:
+        def encode(frame: dict) -> str:
+            return json.dumps(frame) + "\n"
+        media_type = "application/x-ndjson"
+    
+    pages = user_scopus_service.iter_pages(
+        full_query,
+        request.limit,
+        request.sort_by.value,
+        start=(request.page - 1) * request.limit
+    )
+    # Fetch the first page before responding so upfront failures keep their status code
+    first_page = await run_in_threadpool(next, pages, None)
+    
+    def frames():
+        # Runs in Starlette's threadpool; only one page is held at a time
+        returned_count = 0
+        total_available = 0
+        partial = False
+        try:
+            remaining_pages = itertools.chain([first_page] if first_page else [], pages)
+            for entries, total_available in remaining_pages:
+                chunk = []
+                for entry in entries:
+                    if 'error' in entry:
+                        continue
+                    chunk.append(encode({"type": "paper", "paper": user_scopus_service.parse_entry(entry)}))
+                returned_count += len(chunk)
+                yield "".join(chunk)
+        except HTTPException as exc:
+            partial = True
+            yield encode({"type": "error", "detail": exc.detail})
+        
+        yield encode({
+            "type": "summary",
+            "query": full_query,
+            "total_available": total_available,
+            "returned_count": returned_count,
+            "page": request.page,
+            "per_page": request.limit,
+            "partial": partial,
+            "execution_time": round(time.monotonic() - start_time, 3)
+        })
+    
+    return StreamingResponse(
+        frames(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def batch_search_papers(
+    batch: BatchSearchRequest,
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
+):
+    """
+    Run many searches in one request (e.g. keyword variants for a systematic review)
+    
+    Searches run concurrently under the key's Scopus rate limit and share one deadline.
+    A failing search is reported in its own result and does not fail the batch.
+    The union deduplicates papers by EID and counts how many searches returned each.
+    """
+    start_time = time.monotonic()
+    deadline = start_time + settings.search_deadline
+    semaphore = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+    
+    async def run_one(index: int, request: SearchRequest) -> BatchQueryResult:
+        async with semaphore:
+            try:
+                papers, full_query, total_available = await run_in_threadpool(
+                    user_scopus_service.search_papers,
+                    query=request.query,
+                    limit=request.limit,
+                    year_from=request.year_from,
+                    year_to=request.year_to,
+                    document_type=request.document_type.value if request.document_type else None,
+                    subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
+                    sort_by=request.sort_by.value,
+                    page=request.page,
+                    use_cache=True,
+                    deadline=deadline
+                )
+                partial = False
+            except PartialSearchResults as exc:
+                papers, full_query, total_available, partial = exc.papers, exc.query, exc.total_available, True
+            except HTTPException as exc:
+                return BatchQueryResult(index=index, query=request.query, error=str(exc.detail))
+            except Exception as exc:
+                # Anything else (e.g. an unparseable entry) still only fails this query
+                print(f"⚠️  Batch query {index} failed: {exc}")
+                return BatchQueryResult(
+                    index=index,
+                    query=request.query,
+                    error=str(exc) if settings.debug else "Search failed"
+                )
+        return BatchQueryResult(
+            index=index,
+            query=full_query,
+            total_available=total_available,
+            returned_count=len(papers),
+            papers=papers,
+            partial=partial
+        )
+    
+    results = await asyncio.gather(*(run_one(i, request) for i, request in enumerate(batch.queries)))
+    
+    # Deduplicate by EID (DOI or title when Scopus has no EID)
+    union: dict[str, dict] = {}
+    for result in results:
+        for paper in result.papers:
+            key = _paper_identity(paper.model_dump())
+            entry = union.get(key)
+            if entry is None:
+                union[key] = entry = {**paper.model_dump(), "overlap": 0, "query_indices": []}
+            if result.index not in entry["query_indices"]:
+                entry["query_indices"].append(result.index)
+                entry["overlap"] += 1
+    union_papers = sorted(union.values(), key=lambda p: (-p["overlap"], -p["cited_by"]))
+    
+    return BatchSearchResponse(
+        results=results,
+        union=union_papers,
+        union_count=len(union_papers),
+        total_returned=sum(result.returned_count for result in results),
+        execution_time=round(time.monotonic() - start_time, 3)
     )
 
 
@@ -117,29 +373,15 @@ async def quick_search(
     year_from: Optional[int] = Query(None, ge=1900, le=2025),
     year_to: Optional[int] = Query(None, ge=1900, le=2025),
     sort: SortBy = Query(SortBy.citations, description="Sort by"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """
     Quick search endpoint (GET method) - Requires authentication
     
     Example: /api/quick-search?q=machine%20learning&limit=50&year_from=2020
     """
-    # Get user's API key
-    api_key = db.query(ApiKey).filter(
-        ApiKey.user_id == current_user.id,
-        ApiKey.is_active == True
-    ).first()
-    
-    if not api_key:
-        raise HTTPException(status_code=403, detail="No active Scopus API key found")
-    
-    decrypted_key = decrypt_api_key(api_key.api_key)
-    
-    from app.services.scopus_service import ScopusService
-    user_scopus_service = ScopusService(decrypted_key)
-    
-    papers, _, _ = user_scopus_service.search_papers(
+    papers, _, _ = await run_in_threadpool(
+        user_scopus_service.search_papers,
         query=q,
         limit=limit,
         year_from=year_from,
@@ -157,36 +399,31 @@ async def quick_search(
 
 @router.get("/highly-cited")
 async def get_highly_cited(
-    query: str = Query(..., description="Search query"),
+    query: Optional[str] = Query(None, description="Search query"),
     min_citations: int = Query(100, ge=1, description="Minimum citations"),
     limit: int = Query(50, ge=1, le=500),
+    result_set_id: Optional[str] = Query(None, description="Filter a previous search result set instead of querying Scopus"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
 ):
     """Get highly cited papers (filtered by minimum citations) - Requires authentication"""
-    # Get user's API key
-    api_key = db.query(ApiKey).filter(
-        ApiKey.user_id == current_user.id,
-        ApiKey.is_active == True
-    ).first()
-    
-    if not api_key:
-        raise HTTPException(status_code=403, detail="No active Scopus API key found")
-    
-    decrypted_key = decrypt_api_key(api_key.api_key)
-    
-    from app.services.scopus_service import ScopusService
-    user_scopus_service = ScopusService(decrypted_key)
+    if result_set_id:
+        result_set = result_set_store.get(result_set_id, current_user.id)
+        if result_set is None:
+            raise HTTPException(status_code=404, detail="Result set not found or expired")
+        rows = result_set.sort(result_set.select(min_citations=min_citations), "-citedby-count")
+        return {
+            "query": result_set.query,
+            "min_citations": min_citations,
+            "total_found": len(rows),
+            "papers": list(result_set.iter_rows(rows[:limit]))
+        }
     
-    papers, _, _ = user_scopus_service.search_papers(
-        query=query,
-        limit=limit,
-        sort_by="-citedby-count",
-        use_cache=False
-    )
+    if not query:
+        raise HTTPException(status_code=400, detail="Either query or result_set_id is required")
     
-    # Filter by min citations
-    highly_cited = [p for p in papers if p['cited_by'] >= min_citations]
+    # Stops paging at the first paper below min_citations
+    highly_cited, _ = await run_in_threadpool(user_scopus_service.search_highly_cited, query, min_citations, limit)
     
     return {
         "query": query,
@@ -2,55 +2,80 @@
 Statistics API routes
 """
 
-from fastapi import APIRouter, HTTPException
-import pandas as pd
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 
 from app.schemas import SearchRequest, StatsResponse
-from app.services import scopus_service
+from app.core.dependencies import get_user_scopus_service
+from app.services.scopus_service import ScopusService
+from app.services.stats_engine import StatsAccumulator
 
 router = APIRouter(prefix="/api", tags=["statistics"])
 
 
 @router.post("/stats", response_model=StatsResponse)
-async def get_statistics(request: SearchRequest):
+async def get_statistics(
+    request: SearchRequest,
+    user_scopus_service: ScopusService = Depends(get_user_scopus_service)
+):
     """
     Get statistical analysis dari hasil search
     
     Provides comprehensive statistics including:
-    - Citation metrics (total, average, median, min, max)
-    - Year distribution
-    - Top journals/conferences
+    - Citation metrics (total, average, median, percentiles, h/g-index) over up to `limit` papers
+    - Year, journal, subject area, document type, open access and country
+      distributions over all matching papers (Scopus facets)
     """
-    # Use service to search
-    papers, _, _ = scopus_service.search_papers(
+    full_query = user_scopus_service.build_query(
         query=request.query,
-        limit=request.limit,
         year_from=request.year_from,
         year_to=request.year_to,
         document_type=request.document_type.value if request.document_type else None,
-        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None,
-        sort_by=request.sort_by.value
+        subject_areas=[area.value for area in request.subject_areas] if request.subject_areas else None
     )
     
-    if not papers:
-        raise HTTPException(status_code=404, detail="No papers found")
+    # One count=0 request gives population-wide distributions
+    try:
+        total_available, facets = await run_in_threadpool(user_scopus_service.get_facets, full_query)
+    except HTTPException as exc:
+        if exc.status_code == 429:
+            # Out of quota: the sample fetch below would fail the same way
+            raise
+        # Keys without facet access fall back to the fetched sample
+        print(f"⚠️  Scopus facets unavailable, using sample distributions: {exc.detail}")
+        total_available, facets = None, {}
+    
+    # Fold pages into the accumulator as they arrive; papers are not kept
+    def accumulate() -> tuple[StatsAccumulator, int]:
+        stats = StatsAccumulator()
+        sample_total = 0
+        for entries, sample_total in user_scopus_service.iter_pages(full_query, request.limit, request.sort_by.value):
+            stats.update(user_scopus_service.parse_entry(entry) for entry in entries if 'error' not in entry)
+        return stats, sample_total
     
-    # Create DataFrame for analysis
-    df = pd.DataFrame(papers)
+    stats, sample_total = await run_in_threadpool(accumulate)
+    
+    if not stats.count:
+        raise HTTPException(status_code=404, detail="No papers found")
     
-    # Calculate statistics
-    citations = df['cited_by'].tolist()
-    years = df['year'].value_counts().to_dict()
-    journals = df['publication'].value_counts().head(10).to_dict()
+    summary = stats.summary()
+    years = facets.get('pubyear')
+    journals = facets.get('exactsrctitle')
+    population = bool(years and journals)
+    if population:
+        known_years = sorted(year for year in years if year.isdigit())
+        summary.update(
+            papers_per_year=years,
+            top_journals=dict(list(journals.items())[:10]),
+            year_range=f"{known_years[0]} - {known_years[-1]}" if known_years else "N/A"
+        )
     
     return StatsResponse(
-        total_papers=len(papers),
-        total_citations=sum(citations),
-        avg_citations=sum(citations) / len(citations) if citations else 0,
-        median_citations=sorted(citations)[len(citations)//2] if citations else 0,
-        max_citations=max(citations) if citations else 0,
-        min_citations=min(citations) if citations else 0,
-        year_range=f"{df['year'].min()} - {df['year'].max()}",
-        papers_per_year=years,
-        top_journals=journals
+        **summary,
+        total_available=total_available if total_available is not None else sample_total,
+        subject_areas=facets.get('subjarea', {}),
+        document_types=facets.get('doctype', {}),
+        open_access=facets.get('openaccess', {}),
+        countries=facets.get('affilcountry', {}),
+        population_distributions=population
     )
@@ -3,13 +3,44 @@ Wishlist API routes
 Users can save, list, and delete papers from their wishlist
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import base64
+import json
+from datetime import datetime
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
 
-from app.db import get_db, User, Wishlist
-from app.schemas.auth import WishlistCreate, WishlistResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_db, User, Wishlist
+from app.db.database import SessionLocal
+from app.schemas import ExportFormat
+from app.schemas.auth import (
+    WishlistBulkAddResponse,
+    WishlistBulkCreate,
+    WishlistCheckResponse,
+    WishlistCreate,
+    WishlistEids,
+    WishlistPage,
+    WishlistResponse,
+)
 from app.core.dependencies import get_current_user
+from app.services.export_service import STREAM_WRITERS, TABULAR_FORMATS, columnar_available
+
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = 500
+
+# Listing: largest page, and how far the first page counts before estimating
+WISHLIST_MAX_PAGE_SIZE = 200
+WISHLIST_COUNT_CAP = 10000
+WISHLIST_FIELDS = tuple(WishlistResponse.model_fields)
+
+# Bulk add relies on the unique (user_id, eid) index via ON CONFLICT
+INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 router = APIRouter(prefix="/api/wishlist", tags=["wishlist"])
 
@@ -17,7 +48,7 @@ router = APIRouter(prefix="/api/wishlist", tags=["wishlist"])
 @router.post("/", response_model=WishlistResponse, status_code=status.HTTP_201_CREATED)
 async def add_to_wishlist(
     item_data: WishlistCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -25,10 +56,10 @@ async def add_to_wishlist(
     """
     # Check if already in wishlist (by EID if available)
     if item_data.eid:
-        existing = db.query(Wishlist).filter(
+        existing = (await db.execute(select(Wishlist).where(
             Wishlist.user_id == current_user.id,
             Wishlist.eid == item_data.eid
-        ).first()
+        ))).scalars().first()
         
         if existing:
             raise HTTPException(
@@ -43,40 +74,255 @@ async def add_to_wishlist(
     )
     
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent add of the same EID
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Paper already in wishlist"
+        )
+    await db.refresh(new_item)
     
     return new_item
 
 
-@router.get("/", response_model=List[WishlistResponse])
+def _insert_ignoring_duplicates(db: AsyncSession):
+    """INSERT ... ON CONFLICT (user_id, eid) DO NOTHING for the session's backend"""
+    insert = INSERT_BY_DIALECT[db.bind.dialect.name]
+    return insert(Wishlist).on_conflict_do_nothing(index_elements=["user_id", "eid"])
+
+
+def _unique_eids(eids: List[str]) -> List[str]:
+    return list(dict.fromkeys(eid.strip() for eid in eids if eid and eid.strip()))
+
+
+@router.post("/bulk", response_model=WishlistBulkAddResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_add_to_wishlist(
+    request: WishlistBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Save up to 1000 papers in one statement
+    
+    Papers whose EID is already in the wishlist (or repeated in the request)
+    are skipped rather than rejected.
+    """
+    rows = [{"user_id": current_user.id, **item.model_dump()} for item in request.items]
+    added = (await db.scalars(
+        _insert_ignoring_duplicates(db).values(rows).returning(Wishlist)
+    )).all()
+    await db.commit()
+    
+    return WishlistBulkAddResponse(added=added, skipped=len(rows) - len(added))
+
+
+@router.post("/bulk/check", response_model=WishlistCheckResponse)
+async def bulk_check_in_wishlist(
+    request: WishlistEids,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Check which of up to 1000 papers (by EID) are in the wishlist
+    """
+    rows = (await db.execute(select(Wishlist.eid, Wishlist.id).where(
+        Wishlist.user_id == current_user.id,
+        Wishlist.eid.in_(_unique_eids(request.eids))
+    ))).all()
+    
+    return WishlistCheckResponse(in_wishlist={eid: item_id for eid, item_id in rows})
+
+
+@router.post("/bulk/remove")
+async def bulk_remove_from_wishlist(
+    request: WishlistEids,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Remove up to 1000 papers (by EID) from the wishlist
+    """
+    result = await db.execute(delete(Wishlist).where(
+        Wishlist.user_id == current_user.id,
+        Wishlist.eid.in_(_unique_eids(request.eids))
+    ))
+    await db.commit()
+    
+    return {"removed": result.rowcount}
+
+
+def _encode_cursor(created_at: datetime, item_id: int) -> str:
+    payload = json.dumps([created_at.isoformat() if created_at else None, item_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def wishlist_page_statement(user_id: int, columns: list, cursor: Optional[str], limit: int):
+    """Keyset query for one page, newest first, ordered by (created_at, id)"""
+    statement = select(*columns).where(Wishlist.user_id == user_id)
+    if cursor:
+        created_at, item_id = _decode_cursor(cursor)
+        # Compare against the stored timestamp of the cursor row, so the
+        # position is exact whatever precision the backend keeps; the
+        # encoded value only matters if that row was deleted meanwhile
+        anchor = func.coalesce(
+            select(Wishlist.created_at)
+            .where(Wishlist.id == item_id, Wishlist.user_id == user_id)
+            .scalar_subquery(),
+            created_at
+        )
+        statement = statement.where(tuple_(Wishlist.created_at, Wishlist.id) < tuple_(anchor, item_id))
+    return statement.order_by(Wishlist.created_at.desc(), Wishlist.id.desc()).limit(limit)
+
+
+@router.get("/", response_model=WishlistPage)
 async def get_wishlist(
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=WISHLIST_MAX_PAGE_SIZE, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,eid (id is always included)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all papers in user's wishlist
+    Get the user's wishlist one page at a time, newest first
+    
+    Pages are addressed by an opaque cursor (keyset pagination), so every
+    page costs the same however long the list is. `total` is returned with
+    the first page; past 10,000 items it is a lower bound (`total_is_exact`
+    is false).
     """
-    items = db.query(Wishlist).filter(
-        Wishlist.user_id == current_user.id
-    ).order_by(Wishlist.created_at.desc()).all()
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in WISHLIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(WISHLIST_FIELDS)}"
+            )
+        selected = ["id"] + [name for name in selected if name != "id"]
+    else:
+        selected = list(WISHLIST_FIELDS)
+    
+    # id and created_at are always read, they make up the cursor
+    columns = [getattr(Wishlist, name) for name in dict.fromkeys(["id", "created_at", *selected])]
+    rows = (await db.execute(
+        wishlist_page_statement(current_user.id, columns, cursor, limit + 1)
+    )).mappings().all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    
+    items = []
+    for row in rows:
+        item = {name: row[name] for name in selected}
+        if "cited_by" in item:
+            item["cited_by"] = item["cited_by"] or 0
+        items.append(item)
+    
+    total, total_is_exact = None, True
+    if cursor is None:
+        # Count at most one past the cap, so this is bounded too
+        capped = select(Wishlist.id).where(Wishlist.user_id == current_user.id).limit(WISHLIST_COUNT_CAP + 1)
+        total = (await db.execute(select(func.count()).select_from(capped.subquery()))).scalar_one()
+        if total > WISHLIST_COUNT_CAP:
+            total, total_is_exact = WISHLIST_COUNT_CAP, False
     
-    return items
+    return WishlistPage(items=items, next_cursor=next_cursor, total=total, total_is_exact=total_is_exact)
+
+
+# Exported columns: the paper fields a wishlist row stores, plus the user's notes
+WISHLIST_EXPORT_COLUMNS = ("title", "authors", "year", "publication", "cited_by", "doi", "eid", "scopus_url", "notes")
+
+
+def _iter_wishlist_pages(user_id: int) -> Iterator[List[dict]]:
+    """Wishlist rows as export pages, read through a server-side cursor"""
+    # Runs in the threadpool with its own sync session; the request-scoped
+    # session is closed before a streamed body is sent
+    db = SessionLocal()
+    try:
+        statement = (
+            select(
+                Wishlist.title,
+                Wishlist.authors,
+                Wishlist.year,
+                Wishlist.publication,
+                Wishlist.cited_by,
+                Wishlist.doi,
+                Wishlist.eid,
+                Wishlist.scopus_url,
+                Wishlist.notes,
+            )
+            .where(Wishlist.user_id == user_id)
+            .order_by(Wishlist.created_at.desc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in db.execute(statement).mappings().partitions():
+            yield [{**row, "cited_by": row["cited_by"] or 0} for row in rows]
+    finally:
+        db.close()
+
+
+@router.get("/export/{format}")
+async def export_wishlist(
+    format: ExportFormat,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the whole wishlist as CSV, BibTeX, RIS, CSL-JSON, Parquet or Arrow
+    
+    Rows are read in batches through a server-side cursor, so memory stays
+    flat however long the list is. Exports include your notes; tabular
+    formats only carry the columns a wishlist stores.
+    """
+    if format.value not in STREAM_WRITERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Wishlist export supports: {', '.join(STREAM_WRITERS)}"
+        )
+    if format in (ExportFormat.parquet, ExportFormat.arrow) and not columnar_available():
+        raise HTTPException(status_code=501, detail="Parquet and Arrow exports require pyarrow to be installed")
+    
+    writer, media_type, extension = STREAM_WRITERS[format.value]
+    if format.value in TABULAR_FORMATS:
+        writer = partial(writer, columns=WISHLIST_EXPORT_COLUMNS)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return StreamingResponse(
+        writer(_iter_wishlist_pages(current_user.id)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=wishlist_{timestamp}.{extension}"
+        }
+    )
 
 
 @router.get("/{item_id}", response_model=WishlistResponse)
 async def get_wishlist_item(
     item_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific wishlist item
     """
-    item = db.query(Wishlist).filter(
+    item = (await db.execute(select(Wishlist).where(
         Wishlist.id == item_id,
         Wishlist.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not item:
         raise HTTPException(
@@ -90,16 +336,16 @@ async def get_wishlist_item(
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_from_wishlist(
     item_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Remove a paper from wishlist
     """
-    item = db.query(Wishlist).filter(
+    item = (await db.execute(select(Wishlist).where(
         Wishlist.id == item_id,
         Wishlist.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not item:
         raise HTTPException(
@@ -107,8 +353,8 @@ async def delete_from_wishlist(
             detail="Wishlist item not found"
         )
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     
     return None
 
@@ -117,16 +363,16 @@ async def delete_from_wishlist(
 async def update_wishlist_notes(
     item_id: int,
     notes: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update notes for a wishlist item
     """
-    item = db.query(Wishlist).filter(
+    item = (await db.execute(select(Wishlist).where(
         Wishlist.id == item_id,
         Wishlist.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not item:
         raise HTTPException(
@@ -135,8 +381,8 @@ async def update_wishlist_notes(
         )
     
     item.notes = notes
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     
     return item
 
@@ -144,16 +390,16 @@ async def update_wishlist_notes(
 @router.get("/check/{eid}")
 async def check_in_wishlist(
     eid: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Check if a paper (by EID) is in wishlist
     """
-    item = db.query(Wishlist).filter(
+    item = (await db.execute(select(Wishlist).where(
         Wishlist.user_id == current_user.id,
         Wishlist.eid == eid
-    ).first()
+    ))).scalars().first()
     
     return {
         "in_wishlist": item is not None,
@@ -6,7 +6,7 @@ Supports environment variables and .env files
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 import secrets
-from urllib.parse import quote
+from urllib.parse import quote, parse_qsl, urlencode
 
 
 class Settings(BaseSettings):
@@ -31,6 +31,20 @@ class Settings(BaseSettings):
         if self.database_url.startswith("postgres://"):
             return self.database_url.replace("postgres://", "postgresql://", 1)
         return self.database_url
+    
+    @property
+    def async_database_url(self) -> str:
+        """Database URL for the async engine (asyncpg / aiosqlite drivers)"""
+        scheme, _, rest = self.database_url_fixed.partition("://")
+        backend = scheme.split("+", 1)[0]
+        if backend == "postgresql":
+            # asyncpg takes `ssl` instead of libpq's `sslmode`
+            location, _, query = rest.partition("?")
+            params = [("ssl" if key == "sslmode" else key, value) for key, value in parse_qsl(query)]
+            return f"postgresql+asyncpg://{location}" + (f"?{urlencode(params)}" if params else "")
+        if backend == "sqlite":
+            return f"sqlite+aiosqlite://{rest}"
+        return self.database_url_fixed
     
     # Redis Configuration (from Heroku)
     redis_url: str = "redis://localhost:6379/0"
@@ -41,6 +55,8 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 7 days
     encryption_key: str = secrets.token_urlsafe(32)  # For encrypting API keys
+    bcrypt_rounds: int = 12  # Hashes with other costs are upgraded on next login
+    password_hash_workers: int = 4  # Threads for bcrypt, keeps it off the event loop
     
     # CORS Settings
     cors_origins: str = "*"  # Changed to string, can be comma-separated
@@ -137,11 +153,51 @@ class Settings(BaseSettings):
         return [f"{mirror}/{encoded_identifier}" for mirror in self.scihub_mirror_list]
     
     # API Limits
-    max_results_per_page: int = 25
+    max_results_per_page: int = 25  # Safe page size for basic keys
+    max_entitled_page_size: int = 200  # Largest page size probed for entitled keys
+    page_size_cache_ttl: int = 60 * 60 * 24  # Remember a key's page size for 1 day
     max_total_results: int = 1000
     default_limit: int = 25
     request_timeout: int = 30
+    search_deadline: float = 25.0  # Overall budget for one search request (Heroku router cuts at 30s)
+    scopus_requests_per_second: float = 9.0  # Per API key; 0 disables rate limiting
+    batch_max_concurrency: int = 4  # Searches run at once by /api/search/batch
+    
+    # Hedged requests (duplicate a page request that outlives the key's p95 latency)
+    scopus_hedging_enabled: bool = False
+    hedge_min_samples: int = 20  # Latency samples needed before hedging a key
+    hedge_max_workers: int = 16  # Concurrent duplicate (hedge) requests per process
     
+    # Background jobs
+    job_backend: str = "inprocess"  # "inprocess" or "redis" (run `python -m app.worker` on worker nodes)
+    job_workers: int = 2  # In-process worker threads
+    job_chunk_size: int = 500  # Papers per stored result chunk
+    job_result_ttl: int = 60 * 60 * 24  # Keep job state and results for 1 day
+    job_max_in_memory: int = 20  # Jobs kept per process when Redis is unavailable
+    job_poll_interval: float = 1.0  # Seconds between progress events
+    job_heartbeat_interval: int = 10  # Seconds between liveness beats of a running job
+    job_stale_after: int = 60  # A running job without a beat for this long is marked failed
+    
+    # Server-side result sets (re-sort/filter/page without calling Scopus)
+    result_set_ttl: int = 60 * 60  # 1 hour
+    result_set_max_in_memory: int = 200  # Sets kept decoded per worker
+    
+    # Export artifacts (finished export files reused for repeat/resumed downloads)
+    export_artifact_dir: str = ""  # Default: <system temp>/scopus_exports
+    export_artifact_ttl: int = 60 * 60  # 1 hour
+    
+    # Next-page prefetching
+    prefetch_workers: int = 4
+    prefetch_budget_per_minute: int = 20  # Per user; 0 disables prefetching
+    
+    # Authenticated principal cache (skips the users query on hot paths)
+    principal_cache_ttl: int = 60  # Seconds; 0 disables
+    principal_cache_max_entries: int = 10000
+    
+    # Decrypted API key cache (in-process only, never shared)
+    api_key_cache_ttl: int = 300  # Seconds; 0 disables
+    api_key_cache_max_entries: int = 10000
+    
     # Static Files
     static_dir: str = "static"
     
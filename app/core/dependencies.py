@@ -4,12 +4,16 @@ Dependency injection for FastAPI routes
 
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services import ScopusService, scopus_service
-from app.db import get_db, User
-from app.core.security import decode_access_token
+from app.db import get_async_db, User, ApiKey
+from app.core.security import decode_access_token, decrypt_api_key
+from app.core.principal_cache import principal_cache
+from app.core.key_cache import api_key_cache
 
 # Security scheme
 security = HTTPBearer()
@@ -25,7 +29,7 @@ def get_scopus_service() -> Generator[ScopusService, None, None]:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get current authenticated user from JWT token
@@ -48,13 +52,19 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    # Cache hits return a detached snapshot and skip the users query; the
+    # version stamp checks go to Redis, so they run off the event loop
+    user = await run_in_threadpool(principal_cache.get, email)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        version = await run_in_threadpool(principal_cache.version, email)
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal_cache.put(email, user, version)
     
     if not user.is_active:
         raise HTTPException(
@@ -74,3 +84,34 @@ def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_user_scopus_service(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> ScopusService:
+    """
+    Scopus service bound to the current user's active API key
+    The decrypted key is cached per user, so hot paths skip the query and decrypt.
+    """
+    # Version stamp checks go to Redis, so they run off the event loop
+    decrypted_key = await run_in_threadpool(api_key_cache.get, current_user.id)
+    if decrypted_key is None:
+        version = await run_in_threadpool(api_key_cache.version, current_user.id)
+        encrypted_key = (await db.execute(
+            select(ApiKey.api_key).where(
+                ApiKey.user_id == current_user.id,
+                ApiKey.is_active == True
+            ).limit(1)
+        )).scalar_one_or_none()
+        
+        if not encrypted_key:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No active Scopus API key found. Please add an API key first."
+            )
+        
+        decrypted_key = decrypt_api_key(encrypted_key)
+        api_key_cache.put(current_user.id, decrypted_key, version)
+    
+    return ScopusService(decrypted_key)
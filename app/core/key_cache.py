@@ -0,0 +1,83 @@
+"""
+Per-user cache of decrypted Scopus API keys.
+
+Decrypted keys stay in this process's memory only - they are never written
+to Redis or any other shared store. Key changes rotate a version stamp in
+the shared cache so other workers drop their copy on the next lookup.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from app.core.config import settings
+from app.services.redis_service import redis_cache
+
+
+class ApiKeyCache:
+    """TTL + LRU map of user id -> decrypted active API key."""
+
+    def __init__(self, ttl: int, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, Optional[str], str]] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f"apikey:version:{user_id}"
+
+    def version(self, user_id: int) -> Optional[str]:
+        """Current version stamp; read it *before* loading the key to cache"""
+        return redis_cache.get(self._version_key(user_id))
+
+    def get(self, user_id: int) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, version, api_key = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        if version != self.version(user_id):
+            self._drop(user_id)
+            return None
+        return api_key
+
+    def put(self, user_id: int, api_key: str, version: Optional[str]) -> None:
+        """
+        Cache a key loaded while `version` was current
+
+        Taking the stamp from before the query means a change committed in
+        between leaves this entry already stale instead of masking it.
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, version, api_key)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget the user's key here and on every other worker"""
+        self._drop(user_id)
+        redis_cache.set(self._version_key(user_id), uuid.uuid4().hex, ttl=max(self.ttl, 1) * 2)
+
+
+api_key_cache = ApiKeyCache(
+    ttl=settings.api_key_cache_ttl,
+    max_entries=settings.api_key_cache_max_entries,
+)
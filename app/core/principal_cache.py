@@ -0,0 +1,103 @@
+"""
+Short-lived cache of authenticated users keyed by token subject.
+
+Entries are snapshots of the user's columns, so a cache hit needs no
+database session. Deactivating or deleting a user rotates a version stamp
+in the shared cache; entries whose stamp no longer matches are reloaded,
+which makes the change visible to every worker on its next request.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect
+
+from app.core.config import settings
+from app.db.models import User
+from app.services.redis_service import redis_cache
+
+# Columns copied into a snapshot (hashed_password is deliberately left out)
+SNAPSHOT_FIELDS = ("id", "email", "is_active", "created_at", "updated_at")
+
+
+class PrincipalCache:
+    """TTL + LRU cache of user snapshots, validated against a version stamp."""
+
+    def __init__(self, ttl: int, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Optional[str], dict[str, Any]]] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _version_key(subject: str) -> str:
+        return f"principal:version:{subject}"
+
+    def version(self, subject: str) -> Optional[str]:
+        """Current version stamp; read it *before* loading the user to cache"""
+        return redis_cache.get(self._version_key(subject))
+
+    def get(self, subject: str) -> Optional[User]:
+        """A transient User built from the cached snapshot, or None on a miss"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, version, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+        if version != self.version(subject):
+            self.invalidate_local(subject)
+            return None
+        return User(**snapshot)
+
+    def put(self, subject: str, user: User, version: Optional[str]) -> None:
+        """Cache a user loaded while `version` was current (see ApiKeyCache.put)"""
+        if self.ttl <= 0:
+            return
+        snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, version, snapshot)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_local(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def invalidate(self, subject: str) -> None:
+        """Drop the subject here and, via the version stamp, on every worker"""
+        self.invalidate_local(subject)
+        # Outlive any token that could still present this subject
+        redis_cache.set(self._version_key(subject), uuid.uuid4().hex, ttl=settings.access_token_expire_minutes * 60)
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.principal_cache_ttl,
+    max_entries=settings.principal_cache_max_entries,
+)
+
+
+@event.listens_for(User.is_active, "set")
+def _user_active_changed(target: User, value, oldvalue, initiator) -> None:
+    # New users and snapshots built by PrincipalCache.get have nothing cached
+    state = inspect(target)
+    if state.transient or state.pending:
+        return
+    if target.email and value != oldvalue:
+        principal_cache.invalidate(target.email)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.email)
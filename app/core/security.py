@@ -2,6 +2,8 @@
 Security utilities - Password hashing, JWT tokens, encryption
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
@@ -11,8 +13,20 @@ import base64
 import hashlib
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - hashes outside the configured cost are flagged by needs_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt is CPU-bound; async routes run it here instead of on the event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="bcrypt"
+)
 
 # Encryption for API keys - generate proper Fernet key
 def get_fernet_key() -> bytes:
@@ -30,23 +44,39 @@ except Exception as e:
     cipher_suite = Fernet(Fernet.generate_key())
 
 
+def _prepare_password(password: str) -> str:
+    """Bcrypt only reads 72 bytes; longer passwords are pre-hashed with SHA256"""
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        return hashlib.sha256(password_bytes).hexdigest()
+    return password
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    # Bcrypt has 72 byte limit, truncate if needed
-    if len(plain_password.encode('utf-8')) > 72:
-        plain_password = plain_password[:72]
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context.verify(_prepare_password(plain_password), hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash password - bcrypt has 72 byte limit"""
-    # Bcrypt can only handle passwords up to 72 bytes
-    # Truncate if longer (or pre-hash with SHA256 for very long passwords)
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        # For security, we'll use SHA256 first for long passwords
-        password = hashlib.sha256(password_bytes).hexdigest()
-    return pwd_context.hash(password)
+    return pwd_context.hash(_prepare_password(password))
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify password; also returns a new hash when the stored one uses outdated parameters"""
+    return pwd_context.verify_and_update(_prepare_password(plain_password), hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool"""
+    return await asyncio.wrap_future(password_executor.submit(get_password_hash, password))
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """verify_and_update_password on the bcrypt pool"""
+    return await asyncio.wrap_future(
+        password_executor.submit(verify_and_update_password, plain_password, hashed_password)
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -71,6 +101,20 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+def create_resume_token(data: dict, expires_delta: timedelta) -> str:
+    """Create signed token that lets a client resume a partial search"""
+    to_encode = {**data, "typ": "resume", "exp": datetime.utcnow() + expires_delta}
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+
+def decode_resume_token(token: str) -> Optional[dict]:
+    """Decode resume token - None if invalid, expired or not a resume token"""
+    payload = decode_access_token(token)
+    if payload is None or payload.get("typ") != "resume":
+        return None
+    return payload
+
+
 def encrypt_api_key(api_key: str) -> str:
     """Encrypt API key before storing in database"""
     return cipher_suite.encrypt(api_key.encode()).decode()
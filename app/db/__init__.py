@@ -2,7 +2,7 @@
 Database package
 """
 
-from app.db.database import Base, engine, get_db, init_db
+from app.db.database import Base, engine, async_engine, get_db, get_async_db, init_db
 from app.db.models import User, ApiKey, Wishlist
 
-__all__ = ["Base", "engine", "get_db", "init_db", "User", "ApiKey", "Wishlist"]
+__all__ = ["Base", "engine", "async_engine", "get_db", "get_async_db", "init_db", "User", "ApiKey", "Wishlist"]
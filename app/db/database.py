@@ -2,12 +2,21 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import AsyncGenerator
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Create database engine
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Schema as create_all() left it before migrations were introduced
+BASELINE_REVISION = "0001"
+MIGRATION_LOCK_KEY = 7240518
+
+# Create database engine (sync: migrations, scripts and threadpool code)
 engine = create_engine(
     settings.database_url_fixed,
     pool_pre_ping=True,
@@ -15,8 +24,18 @@ engine = create_engine(
     max_overflow=20
 )
 
-# Create session factory
+# Async engine used by request handlers, so queries don't block the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20
+)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay readable after commit (no implicit refresh IO in async code)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -33,8 +52,31 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """
-    Initialize database - create all tables
+    Initialize database - apply Alembic migrations up to head
+    
+    Databases created by the old create_all() are stamped at the baseline
+    revision first, so only the later migrations run against them.
     """
-    Base.metadata.create_all(bind=engine)
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Several workers start at once; let one of them migrate
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -2,7 +2,7 @@
 Database models for User, ApiKey, and Wishlist
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -27,6 +27,10 @@ class User(Base):
 class ApiKey(Base):
     """API Key model - users can store their Scopus API keys"""
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # Active key lookup on every search
+        Index("ix_api_keys_user_id_is_active", "user_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -42,6 +46,12 @@ class ApiKey(Base):
 class Wishlist(Base):
     """Wishlist model - users can save papers"""
     __tablename__ = "wishlists"
+    __table_args__ = (
+        # One row per paper per user; also serves the by-EID checks
+        Index("uq_wishlists_user_id_eid", "user_id", "eid", unique=True),
+        # Keyset listing, newest first
+        Index("ix_wishlists_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
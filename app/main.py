@@ -12,7 +12,7 @@ import json
 from datetime import datetime
 
 from app.core.config import settings
-from app.api import search, stats, export, author, download, health, auth, apikeys, wishlist, debug
+from app.api import search, stats, export, author, download, health, auth, apikeys, wishlist, debug, jobs, results
 from app.db import init_db
 
 
@@ -140,6 +140,8 @@ def create_application() -> FastAPI:
     app.include_router(export.router)
     app.include_router(author.router)
     app.include_router(download.router)
+    app.include_router(jobs.router)  # Background jobs
+    app.include_router(results.router)  # Result set re-sort/filter/page
     
     # Initialize database on startup
     @app.on_event("startup")
@@ -232,7 +234,8 @@ def create_application() -> FastAPI:
                 "error": True,
                 "message": exc.detail,
                 "status_code": exc.status_code
-            }
+            },
+            headers=getattr(exc, "headers", None)
         )
     
     @app.exception_handler(Exception)
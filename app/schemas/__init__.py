@@ -2,10 +2,20 @@
 Schemas module - Pydantic models for request/response validation
 """
 
-from app.schemas.enums import DocumentType, SubjectArea, SortBy, ExportFormat
+from app.schemas.enums import DocumentType, SubjectArea, SortBy, ExportFormat, StreamFormat, JobKind, JobStatus, FacetField
 from app.schemas.paper import PaperResponse
-from app.schemas.search import SearchRequest, SearchResponse, QuickSearchResponse
+from app.schemas.search import (
+    SearchRequest,
+    SearchResponse,
+    QuickSearchResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    BatchQueryResult,
+    BatchUnionPaper,
+)
 from app.schemas.stats import StatsResponse
+from app.schemas.jobs import JobRequest, JobResponse
+from app.schemas.results import ResultSetQuery, ResultSetResponse
 
 __all__ = [
     # Enums
@@ -13,10 +23,22 @@ __all__ = [
     "SubjectArea", 
     "SortBy",
     "ExportFormat",
+    "StreamFormat",
+    "JobKind",
+    "JobStatus",
+    "FacetField",
     # Models
     "PaperResponse",
     "SearchRequest",
     "SearchResponse",
     "QuickSearchResponse",
+    "BatchSearchRequest",
+    "BatchSearchResponse",
+    "BatchQueryResult",
+    "BatchUnionPaper",
     "StatsResponse",
+    "JobRequest",
+    "JobResponse",
+    "ResultSetQuery",
+    "ResultSetResponse",
 ]
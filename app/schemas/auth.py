@@ -3,7 +3,7 @@ Authentication schemas for request/response
 """
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 
@@ -89,3 +89,32 @@ class WishlistResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class WishlistPage(BaseModel):
+    """One keyset page of the wishlist, newest first"""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next page; null on the last page")
+    total: Optional[int] = Field(None, description="Only computed for the first page")
+    total_is_exact: bool = Field(True, description="False when total is a lower bound (list longer than the count cap)")
+
+
+class WishlistBulkCreate(BaseModel):
+    """Papers to save in one request"""
+    items: List[WishlistCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class WishlistEids(BaseModel):
+    """Scopus EIDs for bulk check/remove"""
+    eids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class WishlistBulkAddResponse(BaseModel):
+    """Result of a bulk add"""
+    added: List[WishlistResponse]
+    skipped: int = Field(..., description="Papers already in the wishlist")
+
+
+class WishlistCheckResponse(BaseModel):
+    """Saved papers among the checked EIDs"""
+    in_wishlist: Dict[str, int] = Field(..., description="EID -> wishlist id; EIDs not listed are not saved")
@@ -44,3 +44,39 @@ class ExportFormat(str, Enum):
     json = "json"
     csv = "csv"
     excel = "excel"
+    parquet = "parquet"
+    arrow = "arrow"
+    bibtex = "bibtex"
+    ris = "ris"
+    csl_json = "csl-json"
+
+
+class StreamFormat(str, Enum):
+    """Streaming search output formats"""
+    ndjson = "ndjson"
+    sse = "sse"
+
+
+class JobKind(str, Enum):
+    """Background job types"""
+    search = "search"  # Offset paging, up to the Search API's 5000-result window
+    harvest = "harvest"  # Cursor paging, no window limit
+
+
+class JobStatus(str, Enum):
+    """Background job lifecycle"""
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class FacetField(str, Enum):
+    """Fields that result sets can be faceted on"""
+    year = "year"
+    publication = "publication"
+    document_type = "document_type"
+    source_type = "source_type"
+    affiliation = "affiliation"
+    open_access = "open_access"
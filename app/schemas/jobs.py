@@ -0,0 +1,55 @@
+"""
+Background job request and response models
+"""
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+from datetime import datetime
+from app.schemas.enums import DocumentType, SubjectArea, SortBy, JobKind, JobStatus
+
+# The Search API refuses `start` beyond this; harvests use cursors instead
+SEARCH_WINDOW = 5000
+
+
+class JobRequest(BaseModel):
+    """Bulk search or harvest to run in the background"""
+    kind: JobKind = Field(JobKind.search, description="search (up to 5000 results) or harvest (cursor paging)")
+    query: str = Field(..., description="Search query (e.g., 'machine learning')", min_length=1)
+    limit: int = Field(1000, ge=1, le=50000, description="Maximum number of results (1-50000)")
+    year_from: Optional[int] = Field(None, ge=1900, le=2025, description="Start year")
+    year_to: Optional[int] = Field(None, ge=1900, le=2025, description="End year")
+    document_type: Optional[DocumentType] = Field(None, description="Document type filter")
+    subject_areas: Optional[List[SubjectArea]] = Field(None, description="Subject area filters")
+    sort_by: SortBy = Field(SortBy.citations, description="Sort results by")
+    
+    @model_validator(mode="after")
+    def check_search_window(self) -> "JobRequest":
+        if self.kind == JobKind.search and self.limit > SEARCH_WINDOW:
+            raise ValueError(f"search jobs return at most {SEARCH_WINDOW} results; use kind=harvest for more")
+        return self
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "kind": "harvest",
+                "query": "machine learning",
+                "limit": 10000,
+                "year_from": 2020,
+                "sort_by": "-date"
+            }
+        }
+
+
+class JobResponse(BaseModel):
+    """Background job state and progress"""
+    id: str = Field(..., description="Job id")
+    kind: JobKind = Field(..., description="Job type")
+    status: JobStatus = Field(..., description="Job status")
+    query: str = Field(..., description="Actual query used")
+    limit: int = Field(..., description="Requested number of results")
+    fetched: int = Field(0, description="Papers fetched so far")
+    total_available: Optional[int] = Field(None, description="Total papers available in Scopus")
+    chunks: int = Field(0, description="Result chunks written so far")
+    error: Optional[str] = Field(None, description="Failure reason")
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,48 @@
+"""
+Server-side result set models
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+from app.schemas.enums import DocumentType, SortBy, FacetField
+from app.schemas.paper import PaperResponse
+
+
+class ResultSetQuery(BaseModel):
+    """Local sort, filter, facet and paging over a stored result set"""
+    sort_by: Optional[SortBy] = Field(None, description="Re-sort results (default: keep fetch order)")
+    year_from: Optional[int] = Field(None, ge=1900, le=2100, description="Start year")
+    year_to: Optional[int] = Field(None, ge=1900, le=2100, description="End year")
+    min_citations: Optional[int] = Field(None, ge=0, description="Minimum citations")
+    document_type: Optional[DocumentType] = Field(None, description="Document type filter")
+    open_access: Optional[bool] = Field(None, description="Only open access (true) or closed (false) papers")
+    publication: Optional[str] = Field(None, description="Exact journal/conference name")
+    page: int = Field(1, ge=1, description="Page number (1-based)")
+    per_page: int = Field(25, ge=1, le=1000, description="Results per page")
+    facets: List[FacetField] = Field(default_factory=list, description="Fields to count values for")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "sort_by": "-date",
+                "year_from": 2022,
+                "min_citations": 10,
+                "page": 1,
+                "per_page": 25,
+                "facets": ["year", "publication"]
+            }
+        }
+
+
+class ResultSetResponse(BaseModel):
+    """One page of a locally queried result set"""
+    result_set_id: str = Field(..., description="Result set id")
+    query: str = Field(..., description="Scopus query the set was fetched with")
+    total_available: int = Field(..., description="Total papers available in Scopus for the query")
+    materialized: int = Field(..., description="Papers stored in the result set")
+    matched: int = Field(..., description="Papers matching the filters")
+    page: int = Field(..., ge=1, description="Current page number")
+    per_page: int = Field(..., ge=1, description="Results per page")
+    total_pages: int = Field(..., ge=1, description="Total number of pages")
+    papers: List[PaperResponse] = Field(..., description="List of papers")
+    facets: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="Value counts over matching papers")
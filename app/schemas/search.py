@@ -18,6 +18,7 @@ class SearchRequest(BaseModel):
     document_type: Optional[DocumentType] = Field(None, description="Document type filter")
     subject_areas: Optional[List[SubjectArea]] = Field(None, description="Subject area filters")
     sort_by: SortBy = Field(SortBy.citations, description="Sort results by")
+    resume_token: Optional[str] = Field(None, description="Token from a partial response to fetch the rest of the page")
     
     class Config:
         json_schema_extra = {
@@ -44,6 +45,9 @@ class SearchResponse(BaseModel):
     query: str = Field(..., description="Actual query used")
     papers: List[PaperResponse] = Field(..., description="List of papers")
     execution_time: float = Field(..., description="Query execution time in seconds")
+    partial: bool = Field(False, description="True if the search deadline or an upstream error cut the page short")
+    resume_token: Optional[str] = Field(None, description="Pass back in SearchRequest to fetch the rest of a partial page")
+    result_set_id: Optional[str] = Field(None, description="Id for re-sorting, filtering and paging these papers via /api/results")
     
     class Config:
         json_schema_extra = {
@@ -55,7 +59,9 @@ class SearchResponse(BaseModel):
                 "total_pages": 109,
                 "query": "machine learning AND PUBYEAR > 2019 AND PUBYEAR < 2025",
                 "papers": [],
-                "execution_time": 2.45
+                "execution_time": 2.45,
+                "partial": False,
+                "resume_token": None
             }
         }
 
@@ -65,3 +71,35 @@ class QuickSearchResponse(BaseModel):
     query: str = Field(..., description="Search query")
     returned_count: int = Field(..., description="Number of papers returned")
     papers: List[PaperResponse] = Field(..., description="List of papers")
+
+
+class BatchSearchRequest(BaseModel):
+    """Several searches run together"""
+    queries: List[SearchRequest] = Field(..., min_length=1, max_length=50, description="Searches to run (1-50)")
+
+
+class BatchQueryResult(BaseModel):
+    """Result of one search in a batch"""
+    index: int = Field(..., description="Position of the search in the request")
+    query: str = Field(..., description="Actual query used")
+    total_available: int = Field(0, description="Total papers available in Scopus")
+    returned_count: int = Field(0, description="Number of papers returned")
+    papers: List[PaperResponse] = Field(default_factory=list, description="List of papers")
+    partial: bool = Field(False, description="True if the batch deadline cut this search short")
+    error: Optional[str] = Field(None, description="Error message if this search failed")
+
+
+class BatchUnionPaper(PaperResponse):
+    """Paper in the deduplicated union of a batch"""
+    overlap: int = Field(..., description="Number of searches that returned this paper")
+    query_indices: List[int] = Field(..., description="Searches that returned this paper")
+
+
+class BatchSearchResponse(BaseModel):
+    """Per-search results plus their EID-deduplicated union"""
+    results: List[BatchQueryResult] = Field(..., description="Results in request order")
+    union: List[BatchUnionPaper] = Field(..., description="Unique papers, most shared first")
+    union_count: int = Field(..., description="Number of unique papers")
+    total_returned: int = Field(..., description="Papers returned across all searches, with duplicates")
+    execution_time: float = Field(..., description="Batch execution time in seconds")
+
@@ -3,32 +3,56 @@ Statistics response models
 """
 
 from pydantic import BaseModel, Field
-from typing import Dict
+from typing import Dict, Optional
 
 
 class StatsResponse(BaseModel):
-    """Statistical analysis of search results"""
-    total_papers: int = Field(..., description="Total number of papers")
+    """Statistical analysis of search results
+    
+    Citation metrics describe the fetched papers; distributions come from
+    Scopus facets and cover every matching paper when available.
+    """
+    total_papers: int = Field(..., description="Number of papers analyzed for citation metrics")
+    total_available: Optional[int] = Field(None, description="Total papers matching the query in Scopus")
     total_citations: int = Field(..., description="Sum of all citations")
     avg_citations: float = Field(..., description="Average citations per paper")
     median_citations: float = Field(..., description="Median citations")
     max_citations: int = Field(..., description="Maximum citations")
     min_citations: int = Field(..., description="Minimum citations")
+    std_citations: float = Field(0.0, description="Sample standard deviation of citations")
+    citation_percentiles: Dict[str, int] = Field(default_factory=dict, description="Citation percentiles (p25, p75, p90, p99)")
+    h_index: int = Field(0, description="h-index of the analyzed papers")
+    g_index: int = Field(0, description="g-index of the analyzed papers")
     year_range: str = Field(..., description="Year range of papers")
     papers_per_year: Dict[str, int] = Field(..., description="Distribution by year")
     top_journals: Dict[str, int] = Field(..., description="Top 10 journals/conferences")
+    subject_areas: Dict[str, int] = Field(default_factory=dict, description="Distribution by subject area")
+    document_types: Dict[str, int] = Field(default_factory=dict, description="Distribution by document type")
+    open_access: Dict[str, int] = Field(default_factory=dict, description="Open access breakdown")
+    countries: Dict[str, int] = Field(default_factory=dict, description="Distribution by affiliation country")
+    population_distributions: bool = Field(False, description="Whether distributions cover all matching papers (facets) or only the fetched ones")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "total_papers": 50,
+                "total_available": 1843,
                 "total_citations": 2500,
                 "avg_citations": 50.0,
                 "median_citations": 35.0,
                 "max_citations": 250,
                 "min_citations": 0,
+                "std_citations": 41.7,
+                "citation_percentiles": {"p25": 12, "p75": 61, "p90": 118, "p99": 231},
+                "h_index": 31,
+                "g_index": 48,
                 "year_range": "2020 - 2024",
                 "papers_per_year": {"2020": 10, "2021": 15, "2022": 12, "2023": 8, "2024": 5},
-                "top_journals": {"Nature": 5, "Science": 4}
+                "top_journals": {"Nature": 5, "Science": 4},
+                "subject_areas": {"Computer Science": 1210, "Engineering": 640},
+                "document_types": {"Article": 1102, "Conference Paper": 598},
+                "open_access": {"Open Access": 702},
+                "countries": {"United States": 410, "China": 388},
+                "population_distributions": True
             }
         }
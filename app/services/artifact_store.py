@@ -0,0 +1,284 @@
+"""
+On-disk store for finished export files.
+
+Artifacts are addressed by a hash of the owner, normalized query and export
+format, and kept in a directory per user, so repeat downloads of the same
+export are served from disk, and with Range/ETag support interrupted
+downloads can resume. A user can only ever reach their own files: exports
+are never shared between accounts (each runs on its owner's Scopus key).
+Files expire after a TTL and are written to a temp name first, so readers
+never see partial files.
+
+A build's ETag is fixed when it starts (it is derived from the key and the
+start time, which becomes the file's mtime), so a streamed first download
+can already carry the ETag that later Range/If-Range requests match. If the
+client disconnects mid-stream the build is finished in the background.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import settings
+
+READ_CHUNK_SIZE = 64 * 1024
+# Keys are sha256 hex digests; anything else never reaches the filesystem
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# Finishes builds whose client went away before the end of the stream
+_finisher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="artifacts")
+
+
+def _etag(key: str, mtime: float) -> str:
+    return f'"{key[:32]}-{int(mtime)}"'
+
+
+@dataclass
+class Artifact:
+    key: str
+    path: str
+    size: int
+    mtime: float
+
+    @property
+    def etag(self) -> str:
+        return _etag(self.key, self.mtime)
+
+
+@dataclass
+class ArtifactBuild:
+    """An artifact being written; its ETag is known before it is complete"""
+    key: str
+    owner: int
+    temp_path: str
+    started_at: int
+
+    @property
+    def etag(self) -> str:
+        return _etag(self.key, self.started_at)
+
+
+class ArtifactStore:
+    """Content-addressed export files with a TTL, one directory per owner."""
+
+    def __init__(self, directory: str, ttl: int) -> None:
+        self.directory = directory
+        self.ttl = ttl
+
+    @staticmethod
+    def key(**parts) -> str:
+        """Address of an export; query strings are case- and whitespace-normalized"""
+        if isinstance(parts.get("query"), str):
+            parts["query"] = " ".join(parts["query"].split()).lower()
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _owner_directory(self, owner: int) -> str:
+        return os.path.join(self.directory, str(int(owner)))
+
+    def _path(self, owner: int, name: str) -> str:
+        return os.path.join(self._owner_directory(owner), name)
+
+    def get(self, key: str, owner: int) -> Optional[Artifact]:
+        if not KEY_PATTERN.fullmatch(key):
+            return None
+        path = self._path(owner, key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if stat.st_mtime + self.ttl < time.time():
+            self._remove(path)
+            return None
+        return Artifact(key, path, stat.st_size, stat.st_mtime)
+
+    def begin(self, key: str, owner: int) -> ArtifactBuild:
+        os.makedirs(self._owner_directory(owner), exist_ok=True)
+        temp_path = self._path(owner, f"{key}.{uuid.uuid4().hex}.part")
+        return ArtifactBuild(key, owner, temp_path, int(time.time()))
+
+    def building(self, key: str, owner: int) -> bool:
+        """Whether a build of this key is still being written (by any worker)"""
+        if not KEY_PATTERN.fullmatch(key):
+            return False
+        prefix = f"{key}."
+        try:
+            entries = os.scandir(self._owner_directory(owner))
+            return any(entry.name.startswith(prefix) and entry.name.endswith(".part") for entry in entries)
+        except FileNotFoundError:
+            return False
+
+    def commit(self, build: ArtifactBuild) -> Artifact:
+        """Atomically publish a finished build"""
+        # The mtime carries the build's start time, which the ETag is made of
+        os.utime(build.temp_path, (build.started_at, build.started_at))
+        os.replace(build.temp_path, self._path(build.owner, build.key))
+        self.purge_expired()
+        artifact = self.get(build.key, build.owner)
+        assert artifact is not None
+        return artifact
+
+    def discard(self, build: ArtifactBuild) -> None:
+        self._remove(build.temp_path)
+
+    def tee(self, build: ArtifactBuild, chunks: Iterable[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+        """
+        Pass chunks through while writing them to the build
+
+        The artifact is published once the source is exhausted, even if the
+        client disconnected first, so the download can be resumed. A failing
+        source discards the build.
+        """
+        chunks = iter(chunks)
+        handle = open(build.temp_path, "wb")
+        try:
+            for chunk in chunks:
+                handle.write(_encode(chunk))
+                yield chunk
+        except GeneratorExit:
+            # Client went away: don't block whoever closed us, finish elsewhere
+            handle.close()
+            _finisher.submit(self._finish, build, chunks)
+            return
+        except BaseException:
+            handle.close()
+            self.discard(build)
+            raise
+        handle.close()
+        self.commit(build)
+
+    def _finish(self, build: ArtifactBuild, chunks: Iterator[Union[str, bytes]]) -> None:
+        try:
+            with open(build.temp_path, "ab") as handle:
+                for chunk in chunks:
+                    handle.write(_encode(chunk))
+            self.commit(build)
+        except Exception as exc:
+            self.discard(build)
+            print(f"⚠️  Export {build.key[:12]} abandoned: {exc}")
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for directory in [entry.path for entry in entries if entry.is_dir()]:
+            try:
+                entries.extend(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+        for entry in entries:
+            try:
+                # Abandoned .part files are dropped on the same schedule
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    self._remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _encode(chunk: Union[str, bytes]) -> bytes:
+    return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def _read_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(READ_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """First range of a `bytes=` header as (start, end) inclusive, None if unsatisfiable"""
+    unit, _, ranges = header.partition("=")
+    if unit.strip() != "bytes" or not ranges:
+        return None
+    first = ranges.split(",")[0].strip()
+    start_text, _, end_text = first.partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes
+            suffix = int(end_text)
+            if suffix <= 0:
+                return None
+            return max(size - suffix, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def artifact_headers(etag: str, filename: str, location: Optional[str] = None) -> dict[str, str]:
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f"attachment; filename={filename}",
+    }
+    if location:
+        # Where the finished file can be fetched (and resumed) with GET
+        headers["Content-Location"] = location
+    return headers
+
+
+def artifact_response(
+    request: Request, artifact: Artifact, media_type: str, filename: str, location: Optional[str] = None
+) -> Response:
+    """Serve an artifact honouring If-None-Match, Range and If-Range"""
+    headers = artifact_headers(artifact.etag, filename, location)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or artifact.etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == artifact.etag):
+        byte_range = _parse_range(range_header, artifact.size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{artifact.size}"})
+        start, end = byte_range
+        length = end - start + 1
+        return StreamingResponse(
+            _read_file(artifact.path, start, length),
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{artifact.size}", "Content-Length": str(length)}
+        )
+
+    return StreamingResponse(
+        _read_file(artifact.path, 0, artifact.size),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(artifact.size)}
+    )
+
+
+artifact_store = ArtifactStore(
+    settings.export_artifact_dir or os.path.join(tempfile.gettempdir(), "scopus_exports"),
+    ttl=settings.export_artifact_ttl,
+)
@@ -0,0 +1,353 @@
+"""
+Export writers.
+
+Writers consume an iterable of pages (lists of parsed papers) and produce
+output incrementally, so an export never holds more than one Scopus page
+in memory and the first bytes go out as soon as the first page arrives.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+import unicodedata
+from typing import Iterable, Iterator, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:  # pragma: no cover - listed in requirements.txt, guarded for slim installs
+    pa = None
+    pq = None
+
+from app.services.scopus_service import ScopusService
+
+# Column order of parsed papers (ScopusService.parse_entry)
+EXPORT_COLUMNS = (
+    "title",
+    "authors",
+    "year",
+    "publication",
+    "cited_by",
+    "doi",
+    "document_type",
+    "source_type",
+    "affiliation",
+    "eid",
+    "scopus_url",
+    "open_access",
+    "pdf_url",
+)
+
+
+def iter_paper_pages(service: ScopusService, query: str, limit: int, sort: str) -> Iterator[list[dict]]:
+    """Parsed papers of a search, one Scopus page at a time"""
+    for entries, _ in service.iter_pages(query, limit, sort):
+        papers = [service.parse_entry(entry) for entry in entries if 'error' not in entry]
+        if papers:
+            yield papers
+
+
+def csv_chunks(pages: Iterable[list[dict]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[str]:
+    """CSV text, one chunk per page; starts with a BOM so Excel detects UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for papers in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([paper.get(column, "") for column in columns] for paper in papers)
+        yield buffer.getvalue()
+
+
+def write_xlsx(pages: Iterable[list[dict]], path: str) -> None:
+    """
+    Write an .xlsx file with openpyxl's write-only workbook
+
+    Rows are serialized as they are appended instead of being kept as cell
+    objects, so memory stays flat however many papers are written.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Papers")
+    sheet.append(EXPORT_COLUMNS)
+    for papers in pages:
+        for paper in papers:
+            sheet.append([_xlsx_value(paper.get(column, "")) for column in EXPORT_COLUMNS])
+    workbook.save(path)
+
+
+def _xlsx_value(value):
+    # Control characters in titles would make openpyxl reject the row
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+# ----------------------------------------------------------------------
+# Columnar formats (optional pyarrow)
+# ----------------------------------------------------------------------
+# Repetitive strings are dictionary-encoded; "N/A" years become nulls
+DICTIONARY_COLUMNS = ("publication", "document_type", "source_type", "affiliation")
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def arrow_schema(columns: Sequence[str] = EXPORT_COLUMNS) -> "pa.Schema":
+    def field(name: str) -> "pa.Field":
+        if name == "year":
+            return pa.field(name, pa.int16())
+        if name == "cited_by":
+            return pa.field(name, pa.int32(), nullable=False)
+        if name == "open_access":
+            return pa.field(name, pa.bool_(), nullable=False)
+        if name in DICTIONARY_COLUMNS:
+            return pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+        return pa.field(name, pa.string())
+
+    return pa.schema([field(name) for name in columns])
+
+
+def _record_batch(papers: list[dict], schema: "pa.Schema") -> "pa.RecordBatch":
+    columns = []
+    for field in schema:
+        values = [paper.get(field.name) for paper in papers]
+        if field.name == "year":
+            values = [int(value) if str(value).isdigit() else None for value in values]
+        elif field.name == "open_access":
+            values = [bool(value) for value in values]
+        if pa.types.is_dictionary(field.type):
+            columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every batch"""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(
+    pages: Iterable[list[dict]], columns: Sequence[str] = EXPORT_COLUMNS, compression: str = "zstd"
+) -> Iterator[bytes]:
+    """Parquet bytes with one row group per Scopus page"""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for papers in pages:
+            writer.write_batch(_record_batch(papers, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def arrow_chunks(
+    pages: Iterable[list[dict]], columns: Sequence[str] = EXPORT_COLUMNS, compression: str = "zstd"
+) -> Iterator[bytes]:
+    """Arrow IPC stream bytes with one record batch per Scopus page"""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+    try:
+        for papers in pages:
+            writer.write_batch(_record_batch(papers, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# ----------------------------------------------------------------------
+# Citation manager formats
+# ----------------------------------------------------------------------
+# Escaping tables are built once; str.translate does a single pass per value
+BIBTEX_ESCAPES = str.maketrans({
+    "\\": r"\textbackslash{}",
+    "{": r"\{",
+    "}": r"\}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+    "\r": " ",
+    "\n": " ",
+})
+RIS_ESCAPES = str.maketrans({"\r": " ", "\n": " "})
+_CITATION_KEY_RE = re.compile(r"[^A-Za-z0-9]+")
+
+# Scopus subtypeDescription -> (BibTeX entry type, RIS type, CSL type)
+CITATION_TYPES = {
+    "Article": ("article", "JOUR", "article-journal"),
+    "Review": ("article", "JOUR", "article-journal"),
+    "Letter": ("article", "JOUR", "article-journal"),
+    "Note": ("article", "JOUR", "article-journal"),
+    "Editorial": ("article", "JOUR", "article-journal"),
+    "Conference Paper": ("inproceedings", "CONF", "paper-conference"),
+    "Conference Review": ("inproceedings", "CONF", "paper-conference"),
+    "Book": ("book", "BOOK", "book"),
+    "Book Chapter": ("incollection", "CHAP", "chapter"),
+}
+DEFAULT_CITATION_TYPE = ("misc", "GEN", "article")
+
+
+def _known(paper: dict, field: str) -> str:
+    value = paper.get(field)
+    if value is None or value == "N/A":
+        return ""
+    return str(value)
+
+
+def _citation_key(paper: dict, index: int) -> str:
+    author = _known(paper, "authors").split(" ")[0]
+    eid = _known(paper, "eid").rsplit("-", 1)[-1]
+    ascii_author = unicodedata.normalize("NFKD", author).encode("ascii", "ignore").decode()
+    key = _CITATION_KEY_RE.sub("", f"{ascii_author}{_known(paper, 'year')}")
+    return f"{key or 'paper'}_{eid or index}"
+
+
+def _author_parts(paper: dict) -> tuple[str, str]:
+    """(family, given) of the first author; Scopus gives it as "Surname I." """
+    family, _, given = _known(paper, "authors").partition(" ")
+    return family, given
+
+
+def _inverted_author(paper: dict) -> str:
+    """"Surname, I." as BibTeX and RIS expect, so importers don't swap the parts"""
+    family, given = _author_parts(paper)
+    return f"{family}, {given}" if given else family
+
+
+def bibtex_entry(paper: dict, index: int = 0) -> str:
+    entry_type = CITATION_TYPES.get(paper.get("document_type"), DEFAULT_CITATION_TYPE)[0]
+    container = "booktitle" if entry_type in ("inproceedings", "incollection") else "journal"
+    fields = (
+        ("title", _known(paper, "title")),
+        ("author", _inverted_author(paper)),
+        ("year", _known(paper, "year")),
+        (container, _known(paper, "publication")),
+        ("doi", _known(paper, "doi")),
+        ("url", _known(paper, "scopus_url")),
+        ("note", f"Cited by: {paper.get('cited_by', 0)}"),
+        ("annote", _known(paper, "notes")),
+    )
+    # DOIs and URLs are written verbatim
+    body = ",\n".join(
+        f"  {name} = {{{value if name in ('doi', 'url') else value.translate(BIBTEX_ESCAPES)}}}"
+        for name, value in fields if value
+    )
+    return f"@{entry_type}{{{_citation_key(paper, index)},\n{body}\n}}\n\n"
+
+
+def ris_record(paper: dict) -> str:
+    ris_type = CITATION_TYPES.get(paper.get("document_type"), DEFAULT_CITATION_TYPE)[1]
+    tags = (
+        ("TY", ris_type),
+        ("AU", _inverted_author(paper)),
+        ("TI", _known(paper, "title")),
+        ("T2", _known(paper, "publication")),
+        ("PY", _known(paper, "year")),
+        ("DO", _known(paper, "doi")),
+        ("UR", _known(paper, "scopus_url")),
+        ("N1", f"Cited by: {paper.get('cited_by', 0)}"),
+        ("N1", _known(paper, "notes")),
+    )
+    lines = "".join(f"{tag}  - {value.translate(RIS_ESCAPES)}\n" for tag, value in tags if value)
+    return f"{lines}ER  - \n\n"
+
+
+def csl_item(paper: dict, index: int = 0) -> dict:
+    item = {
+        "id": _known(paper, "eid") or f"paper-{index}",
+        "type": CITATION_TYPES.get(paper.get("document_type"), DEFAULT_CITATION_TYPE)[2],
+        "title": _known(paper, "title"),
+    }
+    family, given = _author_parts(paper)
+    if family:
+        item["author"] = [{"family": family, "given": given} if given else {"literal": family}]
+    optional = (
+        ("container-title", _known(paper, "publication")),
+        ("DOI", _known(paper, "doi")),
+        ("URL", _known(paper, "scopus_url")),
+        ("note", _known(paper, "notes")),
+    )
+    item.update((name, value) for name, value in optional if value)
+    year = _known(paper, "year")
+    if year.isdigit():
+        item["issued"] = {"date-parts": [[int(year)]]}
+    return item
+
+
+def bibtex_chunks(pages: Iterable[list[dict]]) -> Iterator[str]:
+    index = 0
+    for papers in pages:
+        chunk = []
+        for paper in papers:
+            chunk.append(bibtex_entry(paper, index))
+            index += 1
+        yield "".join(chunk)
+
+
+def ris_chunks(pages: Iterable[list[dict]]) -> Iterator[str]:
+    for papers in pages:
+        yield "".join(ris_record(paper) for paper in papers)
+
+
+def csl_json_chunks(pages: Iterable[list[dict]]) -> Iterator[str]:
+    """A CSL-JSON array written one page of items at a time"""
+    yield "["
+    index = 0
+    for papers in pages:
+        chunk = []
+        for paper in papers:
+            chunk.append(("," if index else "") + json.dumps(csl_item(paper, index), ensure_ascii=False))
+            index += 1
+        yield "".join(chunk)
+    yield "]\n"
+
+
+# Streamed export formats: format -> (chunk writer, media type, file extension)
+# Tabular writers take a `columns` layout (EXPORT_COLUMNS by default); the
+# citation writers use whichever fields a paper has
+STREAM_WRITERS = {
+    "csv": (csv_chunks, "text/csv; charset=utf-8", "csv"),
+    "parquet": (parquet_chunks, "application/vnd.apache.parquet", "parquet"),
+    "arrow": (arrow_chunks, "application/vnd.apache.arrow.stream", "arrows"),
+    "bibtex": (bibtex_chunks, "application/x-bibtex; charset=utf-8", "bib"),
+    "ris": (ris_chunks, "application/x-research-info-systems; charset=utf-8", "ris"),
+    "csl-json": (csl_json_chunks, "application/vnd.citationstyles.csl+json", "json"),
+}
+TABULAR_FORMATS = ("csv", "parquet", "arrow")
@@ -0,0 +1,137 @@
+"""
+Hedged Scopus requests for tail-latency reduction.
+
+If a page request is still running after the p95 latency observed for its
+key, a duplicate is sent (if the key's rate budget allows) and whichever
+response arrives first is used. Only duplicates go through the shared pool:
+a primary request runs on the caller's thread, or on a thread of its own
+while it may be hedged, so the pool size never caps regular traffic.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock, Thread
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.services.rate_limiter import scopus_rate_limiter
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies per key."""
+
+    def __init__(self, window: int, min_samples: int) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def p95(self, key: str) -> Optional[float]:
+        """p95 latency for a key, or None until enough samples were seen"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class HedgeStats:
+    """Counters reported by the health endpoint."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.skipped_no_budget = 0
+        self._lock = Lock()
+
+    def record(self, hedged: bool = False, hedge_won: bool = False, skipped: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.hedged += int(hedged)
+            self.hedge_wins += int(hedge_won)
+            self.skipped_no_budget += int(skipped)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.scopus_hedging_enabled,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "skipped_no_budget": self.skipped_no_budget,
+                "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                "win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+            }
+
+
+latency_tracker = LatencyTracker(window=200, min_samples=settings.hedge_min_samples)
+hedge_stats = HedgeStats()
+# Duplicate requests only
+_executor = ThreadPoolExecutor(max_workers=settings.hedge_max_workers, thread_name_prefix="scopus-hedge")
+
+
+def _start(call: Callable[[], T]) -> Future:
+    """Run `call` on a fresh thread right away (no queueing behind other requests)"""
+    future: Future = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(call())
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    future.set_running_or_notify_cancel()
+    Thread(target=run, name="scopus-primary", daemon=True).start()
+    return future
+
+
+def _first_success(futures: list[Future]) -> Future:
+    """Wait until one future succeeds, or all have failed (returns the last failure)"""
+    pending = set(futures)
+    while True:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future
+        if not pending:
+            return next(iter(done))
+
+
+def hedged_call(key: str, call: Callable[[], T]) -> T:
+    """
+    Run `call`, sending a duplicate if it outlives the key's p95 latency.
+    The caller must already hold a rate-limiter token for the primary request.
+    """
+    threshold = latency_tracker.p95(key)
+    if threshold is None:
+        # Nothing to hedge against yet
+        hedge_stats.record()
+        return call()
+
+    primary = _start(call)
+    done, _ = wait([primary], timeout=threshold)
+    if done:
+        hedge_stats.record()
+        return primary.result()
+
+    if not scopus_rate_limiter.try_acquire(key):
+        hedge_stats.record(skipped=True)
+        return primary.result()
+
+    hedge = _executor.submit(call)
+    winner = _first_success([primary, hedge])
+    hedge_stats.record(hedged=True, hedge_won=winner is hedge)
+    return winner.result()
@@ -0,0 +1,317 @@
+"""
+Background jobs for bulk searches and harvests.
+
+A job is submitted over HTTP, executed by a worker pool outside the request
+lifecycle and writes its results in chunks to the job store: Redis when
+available, so every web worker can read them. Without Redis jobs are kept in a
+bounded in-process store and are only visible to the process that ran them.
+Workers run in-process by default; with JOB_BACKEND=redis they pull job ids
+from a Redis list so any node running `python -m app.worker` can execute them.
+
+A running job beats a short-lived heartbeat key from a side thread; if its
+worker dies the key expires and the next read marks the job failed, so
+pollers don't wait forever.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import decrypt_api_key
+from app.schemas.enums import JobKind, JobStatus
+from app.schemas.jobs import SEARCH_WINDOW
+from app.services.redis_service import RedisCache, redis_cache
+from app.services.scopus_service import ScopusService
+
+TERMINAL_STATUSES = {JobStatus.completed.value, JobStatus.failed.value, JobStatus.cancelled.value}
+
+
+class JobStore:
+    """
+    Job metadata, cancel flags and result chunks.
+
+    Kept in Redis when available. Otherwise jobs live in this process, at most
+    `max_in_memory` of them (oldest finished jobs are dropped first); the
+    cache's in-memory fallback is not used, as it only evicts on read.
+    """
+
+    def __init__(self, cache: RedisCache, ttl: int, max_in_memory: int) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.max_in_memory = max_in_memory
+        self._local: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(job_id: str, *parts: Any) -> str:
+        return ":".join(["job", job_id, *map(str, parts)])
+
+    @property
+    def _shared(self) -> bool:
+        return self.cache.redis_client is not None
+
+    def _local_entry(self, job_id: str, create: bool = False) -> Optional[dict]:
+        """Local record of a job; writes (`create`) refresh its expiry"""
+        with self._lock:
+            now = time.time()
+            entry = self._local.get(job_id)
+            if entry is not None and entry["expires_at"] < now:
+                del self._local[job_id]
+                entry = None
+            if create:
+                if entry is None:
+                    entry = self._local[job_id] = {"job": None, "chunks": {}, "cancel": False, "heartbeat": 0.0}
+                entry["expires_at"] = now + self.ttl
+                self._evict(now)
+            return entry
+
+    def _evict(self, now: float) -> None:
+        for job_id in [job_id for job_id, entry in self._local.items() if entry["expires_at"] < now]:
+            del self._local[job_id]
+        while len(self._local) > self.max_in_memory:
+            finished = (
+                job_id for job_id, entry in self._local.items()
+                if entry["job"] and entry["job"]["status"] in TERMINAL_STATUSES
+            )
+            del self._local[next(finished, next(iter(self._local)))]
+
+    def save(self, job: dict) -> None:
+        job["updated_at"] = datetime.utcnow().isoformat()
+        if self._shared:
+            self.cache.set(self._key(job["id"]), job, ttl=self.ttl)
+            return
+        with self._lock:
+            self._local_entry(job["id"], create=True)["job"] = dict(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        if self._shared:
+            return self.cache.get(self._key(job_id))
+        entry = self._local_entry(job_id)
+        return dict(entry["job"]) if entry and entry["job"] else None
+
+    def write_chunk(self, job_id: str, index: int, papers: list[dict]) -> None:
+        if self._shared:
+            self.cache.set(self._key(job_id, "chunk", index), papers, ttl=self.ttl)
+            return
+        with self._lock:
+            self._local_entry(job_id, create=True)["chunks"][index] = papers
+
+    def read_chunk(self, job_id: str, index: int) -> Optional[list[dict]]:
+        if self._shared:
+            return self.cache.get(self._key(job_id, "chunk", index))
+        entry = self._local_entry(job_id)
+        return entry["chunks"].get(index) if entry else None
+
+    def request_cancel(self, job_id: str) -> None:
+        if self._shared:
+            self.cache.set(self._key(job_id, "cancel"), True, ttl=self.ttl)
+            return
+        with self._lock:
+            self._local_entry(job_id, create=True)["cancel"] = True
+
+    def is_cancelled(self, job_id: str) -> bool:
+        if self._shared:
+            return bool(self.cache.get(self._key(job_id, "cancel")))
+        entry = self._local_entry(job_id)
+        return bool(entry and entry["cancel"])
+
+    def heartbeat(self, job_id: str) -> None:
+        if self._shared:
+            self.cache.set(self._key(job_id, "heartbeat"), True, ttl=settings.job_stale_after)
+            return
+        entry = self._local_entry(job_id)
+        if entry is not None:
+            entry["heartbeat"] = time.time() + settings.job_stale_after
+
+    def is_alive(self, job_id: str) -> bool:
+        if self._shared:
+            return self.cache.exists(self._key(job_id, "heartbeat"))
+        entry = self._local_entry(job_id)
+        return bool(entry and entry["heartbeat"] > time.time())
+
+
+job_store = JobStore(redis_cache, ttl=settings.job_result_ttl, max_in_memory=settings.job_max_in_memory)
+
+
+def run_job(job_id: str) -> None:
+    """Execute a queued job, writing progress and result chunks as pages arrive"""
+    job = job_store.get(job_id)
+    if not job or job["status"] != JobStatus.queued.value:
+        return
+    if job_store.is_cancelled(job_id):
+        job["status"] = JobStatus.cancelled.value
+        job_store.save(job)
+        return
+
+    # Beat before the job shows as running, so it is never seen without one
+    job_store.heartbeat(job_id)
+    stop_beating = threading.Event()
+    threading.Thread(
+        target=_beat, args=(job_id, stop_beating), name=f"job-heartbeat-{job_id[:8]}", daemon=True
+    ).start()
+
+    job["status"] = JobStatus.running.value
+    job_store.save(job)
+
+    buffer: list[dict] = []
+    try:
+        service = ScopusService(decrypt_api_key(job["encrypted_api_key"]))
+        if job["kind"] == JobKind.harvest.value:
+            pages = service.iter_cursor_pages(job["query"], job["limit"], job["sort_by"])
+        else:
+            pages = service.iter_pages(job["query"], min(job["limit"], SEARCH_WINDOW), job["sort_by"])
+
+        for entries, total_available in pages:
+            buffer.extend(service.parse_entry(entry) for entry in entries if 'error' not in entry)
+            while len(buffer) >= settings.job_chunk_size:
+                job_store.write_chunk(job_id, job["chunks"], buffer[:settings.job_chunk_size])
+                del buffer[:settings.job_chunk_size]
+                job["chunks"] += 1
+            job["fetched"] += len(entries)
+            job["total_available"] = total_available
+            job_store.save(job)
+
+            if job_store.is_cancelled(job_id):
+                pages.close()
+                job["status"] = JobStatus.cancelled.value
+                break
+        else:
+            job["status"] = JobStatus.completed.value
+    except HTTPException as exc:
+        job["status"] = JobStatus.failed.value
+        job["error"] = str(exc.detail)
+    except Exception as exc:
+        job["status"] = JobStatus.failed.value
+        job["error"] = str(exc) if settings.debug else "Job failed"
+        print(f"⚠️  Job {job_id} failed: {exc}")
+
+    # Keep whatever was fetched, even for cancelled or failed jobs
+    if buffer:
+        job_store.write_chunk(job_id, job["chunks"], buffer)
+        job["chunks"] += 1
+    job_store.save(job)
+    stop_beating.set()
+
+
+def _beat(job_id: str, stop: threading.Event) -> None:
+    while not stop.wait(settings.job_heartbeat_interval):
+        job_store.heartbeat(job_id)
+
+
+class InProcessJobBackend:
+    """Runs jobs on a thread pool inside the web process."""
+
+    def __init__(self, workers: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+
+    def submit(self, job_id: str) -> None:
+        self._executor.submit(run_job, job_id)
+
+
+class RedisQueueJobBackend:
+    """Queues job ids in a Redis list consumed by `python -m app.worker`."""
+
+    QUEUE_KEY = "jobs:queue"
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def submit(self, job_id: str) -> None:
+        self.client.lpush(self.QUEUE_KEY, job_id)
+
+    def work_forever(self, poll_timeout: int = 5) -> None:
+        while True:
+            item = self.client.brpop(self.QUEUE_KEY, timeout=poll_timeout)
+            if item:
+                _, job_id = item
+                run_job(job_id)
+
+
+class JobManager:
+    """Submits jobs to the configured backend and reads their state back."""
+
+    def __init__(self) -> None:
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.job_backend == "redis" and redis_cache.redis_client is not None:
+                self._backend = RedisQueueJobBackend(redis_cache.redis_client)
+            else:
+                if settings.job_backend == "redis":
+                    print("⚠️  JOB_BACKEND=redis but Redis is unavailable. Running jobs in-process.")
+                self._backend = InProcessJobBackend(settings.job_workers)
+        return self._backend
+
+    def submit(self, user_id: int, kind: JobKind, query: str, limit: int, sort_by: str, encrypted_api_key: str) -> dict:
+        now = datetime.utcnow().isoformat()
+        job = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "kind": kind.value,
+            "status": JobStatus.queued.value,
+            "query": query,
+            "limit": limit,
+            "sort_by": sort_by,
+            "encrypted_api_key": encrypted_api_key,
+            "fetched": 0,
+            "total_available": None,
+            "chunks": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        job_store.save(job)
+        self.backend.submit(job["id"])
+        return job
+
+    def get(self, job_id: str, user_id: int) -> Optional[dict]:
+        job = job_store.get(job_id)
+        if job is None or job["user_id"] != user_id:
+            return None
+        if job["status"] == JobStatus.running.value and not job_store.is_alive(job_id):
+            # The worker died mid-job (restart, crash); its results so far are kept
+            job["status"] = JobStatus.failed.value
+            job["error"] = "Job worker stopped responding"
+            job_store.save(job)
+        return job
+
+    def cancel(self, job: dict) -> dict:
+        if job["status"] in TERMINAL_STATUSES:
+            return job
+        job_store.request_cancel(job["id"])
+        if job["status"] == JobStatus.queued.value:
+            # Not picked up yet - workers skip jobs that are no longer queued
+            job["status"] = JobStatus.cancelled.value
+            job_store.save(job)
+        return job
+
+    def read_chunk(self, job: dict, index: int) -> Optional[list[dict]]:
+        return job_store.read_chunk(job["id"], index)
+
+    def iter_results(self, job: dict) -> Iterator[list[dict]]:
+        """Yield the result chunks written so far"""
+        for index in range(job["chunks"]):
+            chunk = self.read_chunk(job, index)
+            if chunk is None:
+                break
+            yield chunk
+
+    def work_forever(self) -> None:
+        backend = self.backend
+        if not isinstance(backend, RedisQueueJobBackend):
+            raise RuntimeError("Job worker requires JOB_BACKEND=redis and a reachable Redis")
+        backend.work_forever()
+
+
+job_manager = JobManager()
@@ -0,0 +1,113 @@
+"""
+Speculative next-page prefetching for paginated searches.
+
+After a page is served, the following page is fetched on a background thread
+and written to the search cache, so the user's next click is a cache hit.
+Each user has at most one prefetch in flight and a per-minute budget.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.services.scopus_service import FetchCancelled
+
+
+class _PendingPrefetch:
+    """A prefetch in flight for one user"""
+
+    __slots__ = ("target", "future", "cancel_event")
+
+    def __init__(self, target: str) -> None:
+        self.target = target
+        self.future: Optional[Future] = None
+        self.cancel_event = threading.Event()
+
+
+class PrefetchManager:
+    """Schedules, budgets and cancels per-user next-page prefetches."""
+
+    def __init__(self, max_workers: int, budget_per_minute: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._budget_per_minute = budget_per_minute
+        self._pending: dict[int, _PendingPrefetch] = {}
+        self._history: dict[int, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _consume_budget(self, user_id: int) -> bool:
+        now = time.monotonic()
+        history = self._history.setdefault(user_id, deque())
+        while history and now - history[0] > 60:
+            history.popleft()
+        if len(history) >= self._budget_per_minute:
+            return False
+        history.append(now)
+        return True
+
+    def _run(self, user_id: int, pending: _PendingPrefetch, fetch: Callable[[threading.Event], object]) -> None:
+        try:
+            fetch(pending.cancel_event)
+        except FetchCancelled:
+            pass
+        except Exception as exc:
+            print(f"⚠️  Prefetch failed: {exc}")
+        finally:
+            with self._lock:
+                if self._pending.get(user_id) is pending:
+                    self._pending.pop(user_id, None)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def claim(self, user_id: int, target: str) -> Optional[Future]:
+        """
+        Called when a user's request arrives.
+        Returns the in-flight prefetch if it is for `target`; otherwise cancels it.
+        """
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending is None:
+                return None
+            if pending.target == target:
+                return pending.future
+            pending.cancel_event.set()
+            self._pending.pop(user_id, None)
+        return None
+
+    def schedule(self, user_id: int, target: str, fetch: Callable[[threading.Event], object]) -> bool:
+        """
+        Prefetch `target` for a user in the background.
+        `fetch` receives a cancel event and should populate the cache.
+        Returns False if the user's budget is exhausted.
+        """
+        if self._budget_per_minute <= 0:
+            return False
+
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is not None:
+                if previous.target == target:
+                    return True
+                previous.cancel_event.set()
+            if not self._consume_budget(user_id):
+                self._pending.pop(user_id, None)
+                return False
+
+            pending = _PendingPrefetch(target)
+            pending.future = self._executor.submit(self._run, user_id, pending, fetch)
+            self._pending[user_id] = pending
+        return True
+
+
+prefetch_manager = PrefetchManager(
+    max_workers=settings.prefetch_workers,
+    budget_per_minute=settings.prefetch_budget_per_minute,
+)
@@ -0,0 +1,115 @@
+"""
+Per-key token bucket limiting calls to the Scopus API.
+
+Scopus throttles each API key to a few requests per second; every upstream
+call draws from the bucket of the key it uses. With Redis the buckets are
+shared, so the limit holds across all web and job workers together; in
+in-memory mode each process has its own buckets and N processes can make
+up to N times SCOPUS_REQUESTS_PER_SECOND calls per key.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Optional
+
+from app.core.config import settings
+from app.services.redis_service import RedisCache, redis_cache
+
+# Refill and take one token atomically; the clock is Redis' so that all
+# workers agree. Returns the seconds to wait (0 when a token was taken).
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float) -> None:
+        self.tokens = tokens
+        self.updated_at = time.monotonic()
+
+
+class RateLimiter:
+    """Token bucket per key, refilled at `rate` tokens per second up to `burst`."""
+
+    def __init__(self, rate: float, burst: float, cache: Optional[RedisCache] = None) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.cache = cache
+        self._script = None
+        self._buckets: dict[str, _Bucket] = {}
+        self._lock = Lock()
+
+    def _take(self, key: str) -> float:
+        """Take a token if available; otherwise return seconds until one is"""
+        client = self.cache.redis_client if self.cache is not None else None
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(_TAKE_SCRIPT)
+                return float(self._script(keys=[f"ratelimit:{key}"], args=[self.rate, self.burst], client=client))
+            except Exception as exc:
+                # Keep limiting per process rather than failing the call
+                print(f"⚠️  Shared rate limit unavailable, using local bucket: {exc}")
+        return self._take_local(key)
+
+    def _take_local(self, key: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.burst)
+            now = time.monotonic()
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+            bucket.updated_at = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+            return (1 - bucket.tokens) / self.rate
+
+    def try_acquire(self, key: str) -> bool:
+        """Take a token without waiting"""
+        if self.rate <= 0:
+            return True
+        return self._take(key) == 0.0
+
+    def acquire(self, key: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a token; False if none became available within `timeout`"""
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(key)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+scopus_rate_limiter = RateLimiter(
+    rate=settings.scopus_requests_per_second,
+    burst=settings.scopus_requests_per_second,
+    cache=redis_cache,
+)
@@ -150,13 +150,23 @@ class RedisCache:
 
         return self._memory_clear_pattern(pattern)
 
+    def search_cache_key(self, query: str, limit: int, filters: dict) -> str:
+        return self._generate_key("search", query=query, limit=limit, **filters)
+
     def cache_search_results(self, query: str, limit: int, filters: dict, results: Any) -> bool:
-        key = self._generate_key("search", query=query, limit=limit, **filters)
-        return self.set(key, results)
+        return self.set(self.search_cache_key(query, limit, filters), results)
 
     def get_cached_search(self, query: str, limit: int, filters: dict) -> Optional[Any]:
-        key = self._generate_key("search", query=query, limit=limit, **filters)
-        return self.get(key)
+        return self.get(self.search_cache_key(query, limit, filters))
+
+    def exists(self, key: str) -> bool:
+        if self.redis_client:
+            try:
+                return bool(self.redis_client.exists(key))
+            except Exception as exc:
+                self._switch_to_memory(f"Redis exists error: {exc}")
+
+        return self._memory_get(key) is not None
 
     def _generate_key(self, prefix: str, **kwargs) -> str:
         params_str = json.dumps(kwargs, sort_keys=True)
@@ -0,0 +1,271 @@
+"""
+Server-side result sets.
+
+A search materializes its papers under an id so later requests can re-sort,
+filter, facet and page them locally without calling Scopus again. Papers are
+stored column by column: numbers in typed arrays and repetitive strings
+(venue, document type, affiliation) dictionary-encoded. Sets live in a small
+in-process LRU and, when Redis is available, are mirrored there for other
+workers. The in-memory cache fallback is not used: it only evicts on read,
+and the bounded LRU already is this process' copy.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from array import array
+from collections import Counter, OrderedDict
+from datetime import datetime
+from threading import RLock
+from typing import Any, Iterable, Iterator, Optional
+
+from app.core.config import settings
+from app.services.redis_service import RedisCache, redis_cache
+
+# Scopus document type codes (as used in DOCTYPE()) -> labels stored on papers
+DOCUMENT_TYPE_LABELS = {
+    "ar": "Article",
+    "cp": "Conference Paper",
+    "re": "Review",
+    "bk": "Book",
+    "ch": "Book Chapter",
+    "no": "Note",
+    "ed": "Editorial",
+    "le": "Letter",
+}
+
+PLAIN_COLUMNS = ("title", "authors", "doi", "eid", "scopus_url", "pdf_url")
+ENCODED_COLUMNS = ("publication", "document_type", "source_type", "affiliation")
+FACET_FIELDS = ("year", "publication", "document_type", "source_type", "affiliation", "open_access")
+
+
+class _EncodedColumn:
+    """Dictionary-encoded string column"""
+
+    __slots__ = ("values", "codes", "_index")
+
+    def __init__(self, values: Optional[list[str]] = None, codes: Optional[Iterable[int]] = None) -> None:
+        self.values: list[str] = values or []
+        self.codes = array("I", codes or [])
+        self._index = {value: code for code, value in enumerate(self.values)}
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+
+class ResultSet:
+    """Columnar, read-only set of parsed papers."""
+
+    def __init__(self, id: str, user_id: int, query: str, total_available: int, created_at: str, expires_at: float) -> None:
+        self.id = id
+        self.user_id = user_id
+        self.query = query
+        self.total_available = total_available
+        self.created_at = created_at
+        self.expires_at = expires_at  # Unix time
+        self.plain: dict[str, list[str]] = {name: [] for name in PLAIN_COLUMNS}
+        self.encoded: dict[str, _EncodedColumn] = {name: _EncodedColumn() for name in ENCODED_COLUMNS}
+        self.year = array("H")  # 0 when unknown
+        self.cited_by = array("I")
+        self.open_access = array("b")
+
+    def __len__(self) -> int:
+        return len(self.cited_by)
+
+    # ------------------------------------------------------------------
+    # Building and serialization
+    # ------------------------------------------------------------------
+    def extend(self, papers: Iterable[dict]) -> None:
+        for paper in papers:
+            for name in PLAIN_COLUMNS:
+                self.plain[name].append(paper.get(name) or "N/A")
+            for name in ENCODED_COLUMNS:
+                self.encoded[name].append(paper.get(name) or "N/A")
+            year = str(paper.get("year", ""))
+            self.year.append(int(year) if year.isdigit() else 0)
+            self.cited_by.append(max(int(paper.get("cited_by") or 0), 0))
+            self.open_access.append(1 if paper.get("open_access") else 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "query": self.query,
+            "total_available": self.total_available,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "plain": self.plain,
+            "encoded": {name: [col.values, col.codes.tolist()] for name, col in self.encoded.items()},
+            "year": self.year.tolist(),
+            "cited_by": self.cited_by.tolist(),
+            "open_access": self.open_access.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResultSet":
+        result_set = cls(
+            data["id"], data["user_id"], data["query"], data["total_available"], data["created_at"], data["expires_at"]
+        )
+        result_set.plain = data["plain"]
+        result_set.encoded = {name: _EncodedColumn(values, codes) for name, (values, codes) in data["encoded"].items()}
+        result_set.year = array("H", data["year"])
+        result_set.cited_by = array("I", data["cited_by"])
+        result_set.open_access = array("b", data["open_access"])
+        return result_set
+
+    # ------------------------------------------------------------------
+    # Local queries
+    # ------------------------------------------------------------------
+    def row(self, i: int) -> dict[str, Any]:
+        """Rebuild one paper in the shape returned by ScopusService.parse_entry"""
+        paper: dict[str, Any] = {name: column[i] for name, column in self.plain.items()}
+        for name, column in self.encoded.items():
+            paper[name] = column[i]
+        paper["year"] = str(self.year[i]) if self.year[i] else "N/A"
+        paper["cited_by"] = self.cited_by[i]
+        paper["open_access"] = bool(self.open_access[i])
+        return paper
+
+    def iter_rows(self, rows: Optional[Iterable[int]] = None) -> Iterator[dict[str, Any]]:
+        for i in rows if rows is not None else range(len(self)):
+            yield self.row(i)
+
+    def iter_pages(self, rows: Optional[list[int]] = None, page_size: int = 200) -> Iterator[list[dict[str, Any]]]:
+        """Rows as lists of papers, the page shape used by the export writers"""
+        rows = rows if rows is not None else list(range(len(self)))
+        for offset in range(0, len(rows), page_size):
+            yield list(self.iter_rows(rows[offset:offset + page_size]))
+
+    def select(
+        self,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        min_citations: Optional[int] = None,
+        document_type: Optional[str] = None,
+        open_access: Optional[bool] = None,
+        publication: Optional[str] = None,
+    ) -> list[int]:
+        """Row numbers matching every given filter"""
+        rows: Iterable[int] = range(len(self))
+        if year_from is not None:
+            rows = [i for i in rows if self.year[i] and self.year[i] >= year_from]
+        if year_to is not None:
+            rows = [i for i in rows if self.year[i] and self.year[i] <= year_to]
+        if min_citations is not None:
+            rows = [i for i in rows if self.cited_by[i] >= min_citations]
+        if open_access is not None:
+            wanted = 1 if open_access else 0
+            rows = [i for i in rows if self.open_access[i] == wanted]
+        for name, value in (("document_type", DOCUMENT_TYPE_LABELS.get(document_type, document_type)), ("publication", publication)):
+            if value is None:
+                continue
+            column = self.encoded[name]
+            code = column.code_of(value)
+            if code is None:
+                return []
+            rows = [i for i in rows if column.codes[i] == code]
+        return list(rows)
+
+    def sort(self, rows: list[int], sort_by: str) -> list[int]:
+        """Order rows like the Scopus `sort` parameter (relevance keeps fetch order)"""
+        if sort_by == "-citedby-count":
+            return sorted(rows, key=lambda i: -self.cited_by[i])
+        if sort_by == "-date":
+            return sorted(rows, key=lambda i: -self.year[i])
+        if sort_by == "date":
+            return sorted(rows, key=lambda i: (self.year[i] == 0, self.year[i]))
+        return rows
+
+    def facets(self, rows: list[int], fields: Iterable[str], top: int = 20) -> dict[str, dict[str, int]]:
+        """Value counts per field over the given rows"""
+        result: dict[str, dict[str, int]] = {}
+        for field in fields:
+            if field == "year":
+                counts = Counter(str(self.year[i]) if self.year[i] else "N/A" for i in rows)
+            elif field == "open_access":
+                counts = Counter("true" if self.open_access[i] else "false" for i in rows)
+            else:
+                column = self.encoded[field]
+                counts = Counter(column.values[code] for code in (column.codes[i] for i in rows))
+            result[field] = dict(counts.most_common(top))
+        return result
+
+
+class ResultSetStore:
+    """In-process LRU of result sets backed by the shared cache."""
+
+    def __init__(self, cache: RedisCache, ttl: int, max_in_memory: int) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.max_in_memory = max_in_memory
+        self._local: OrderedDict[str, ResultSet] = OrderedDict()
+        self._lock = RLock()
+
+    @staticmethod
+    def _key(result_set_id: str) -> str:
+        return f"resultset:{result_set_id}"
+
+    @property
+    def _shared(self) -> bool:
+        return self.cache.redis_client is not None
+
+    def _remember(self, result_set: ResultSet) -> None:
+        with self._lock:
+            self._local[result_set.id] = result_set
+            self._local.move_to_end(result_set.id)
+            while len(self._local) > self.max_in_memory:
+                self._local.popitem(last=False)
+
+    def create(self, user_id: int, query: str, total_available: int, papers: Iterable[dict]) -> ResultSet:
+        result_set = ResultSet(
+            uuid.uuid4().hex, user_id, query, total_available, datetime.utcnow().isoformat(), time.time() + self.ttl
+        )
+        result_set.extend(papers)
+        if self._shared:
+            self.cache.set(self._key(result_set.id), result_set.to_dict(), ttl=self.ttl)
+        self._remember(result_set)
+        return result_set
+
+    def get(self, result_set_id: str, user_id: int) -> Optional[ResultSet]:
+        with self._lock:
+            result_set = self._local.get(result_set_id)
+            if result_set is not None:
+                self._local.move_to_end(result_set_id)
+        if result_set is None:
+            if not self._shared:
+                return None
+            data = self.cache.get(self._key(result_set_id))
+            if data is None:
+                return None
+            result_set = ResultSet.from_dict(data)
+            self._remember(result_set)
+        if result_set.expires_at < time.time():
+            self.delete(result_set_id)
+            return None
+        if result_set.user_id != user_id:
+            return None
+        return result_set
+
+    def delete(self, result_set_id: str) -> None:
+        with self._lock:
+            self._local.pop(result_set_id, None)
+        if self._shared:
+            self.cache.delete(self._key(result_set_id))
+
+
+result_set_store = ResultSetStore(
+    redis_cache,
+    ttl=settings.result_set_ttl,
+    max_in_memory=settings.result_set_max_in_memory,
+)
@@ -2,27 +2,134 @@
 Scopus API Service - Business logic for interacting with Scopus API
 """
 
+import hashlib
+import threading
+import time
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from fastapi import HTTPException
 from app.core.config import settings
 
+# Page sizes tried (largest first) when discovering a key's entitlement
+PAGE_SIZE_CANDIDATES = (200, 100, 50, 25)
+
+# Facets requested for /api/stats: Scopus facet name -> options
+STATS_FACETS = {
+    "pubyear": "count=100,sort=na",
+    "exactsrctitle": "count=10,sort=fd",
+    "subjarea": "count=30,sort=fd",
+    "doctype": "count=20,sort=fd",
+    "openaccess": "count=5,sort=fd",
+    "affilcountry": "count=20,sort=fd",
+}
+
+
+class FetchCancelled(Exception):
+    """Raised when a page fetch is cancelled before it completes"""
+
+
+class FetchInterrupted(Exception):
+    """Raised when a deadline-bound fetch stops early with some pages already in hand"""
+    
+    def __init__(self, reason: str, entries: List[Dict], total_available: int, next_start: int):
+        super().__init__(reason)
+        self.reason = reason  # "deadline" or "error"
+        self.entries = entries
+        self.total_available = total_available
+        self.next_start = next_start
+
+
+class PartialSearchResults(Exception):
+    """Raised by search_papers when a deadline-bound search returns only part of the window"""
+    
+    def __init__(self, reason: str, papers: List[Dict], query: str, total_available: int, next_start: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.papers = papers
+        self.query = query
+        self.total_available = total_available
+        self.next_start = next_start
+
 
 class ScopusService:
     """Service for Scopus API operations"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, view: str = "STANDARD"):
         # API key is required - no fallback to default
         if not api_key:
             raise ValueError("API key is required")
         self.api_key = api_key
+        self.view = view
         self.base_url = settings.scopus_base_url
         self.timeout = settings.request_timeout
         self.max_per_page = settings.max_results_per_page
+        self._page_size: Optional[int] = None
+        self._page_size_confirmed = False
     
     def set_api_key(self, api_key: str):
         """Set API key for this instance"""
         self.api_key = api_key
+        self._page_size = None
+        self._page_size_confirmed = False
+    
+    # ------------------------------------------------------------------
+    # Page size entitlement
+    # ------------------------------------------------------------------
+    @property
+    def key_hash(self) -> str:
+        """Stable, non-reversible identifier for the API key"""
+        return hashlib.sha256(self.api_key.encode()).hexdigest()[:32]
+    
+    def _page_size_cache_key(self) -> str:
+        return f"scopus:page_size:{self.key_hash}:{self.view}"
+    
+    def _page_size_candidates(self) -> List[int]:
+        """Candidate page sizes within configured bounds, largest first"""
+        ceiling = max(settings.max_entitled_page_size, self.max_per_page)
+        candidates = [size for size in PAGE_SIZE_CANDIDATES if self.max_per_page < size <= ceiling]
+        return candidates + [self.max_per_page]
+    
+    @property
+    def page_size(self) -> int:
+        """
+        Largest `count` this key may request for the current view.
+        Remembered per key hash; until confirmed, the largest candidate is assumed
+        and stepped down on the first entitlement error.
+        """
+        if self._page_size is None:
+            from app.services.redis_service import redis_cache
+            cached = redis_cache.get(self._page_size_cache_key())
+            if cached:
+                self._page_size = int(cached)
+                self._page_size_confirmed = True
+            else:
+                self._page_size = self._page_size_candidates()[0]
+        return self._page_size
+    
+    def _remember_page_size(self, size: int) -> None:
+        from app.services.redis_service import redis_cache
+        self._page_size = size
+        self._page_size_confirmed = True
+        redis_cache.set(self._page_size_cache_key(), size, ttl=settings.page_size_cache_ttl)
+    
+    def _downgrade_page_size(self, failed_size: int) -> Optional[int]:
+        """Step down to the next candidate below a rejected page size"""
+        smaller = [size for size in self._page_size_candidates() if size < failed_size]
+        if not smaller:
+            return None
+        self._page_size = smaller[0]
+        if self._page_size == self.max_per_page:
+            # Basic entitlement - nothing left to probe
+            self._remember_page_size(self._page_size)
+        return self._page_size
+    
+    @staticmethod
+    def _is_entitlement_error(response: requests.Response) -> bool:
+        """Scopus answers 400 when `count` exceeds the key's service level"""
+        if response.status_code != 400:
+            return False
+        body = response.text.lower()
+        return "maximum number allowed" in body or "service level" in body
     
     def build_query(
         self,
@@ -51,14 +158,52 @@ class ScopusService:
         
         return full_query
     
+    def _get(
+        self, headers: Dict[str, str], params: Dict[str, Any], timeout: float, deadline: Optional[float] = None
+    ) -> requests.Response:
+        """Rate-limited GET against Scopus, hedged when enabled; waits for a token no longer than `deadline`"""
+        from app.services.hedging import hedged_call, latency_tracker
+        from app.services.rate_limiter import scopus_rate_limiter
+        
+        key = self.key_hash
+        request_params = dict(params)
+        
+        def timed_get() -> requests.Response:
+            started = time.monotonic()
+            response = requests.get(self.base_url, headers=headers, params=request_params, timeout=timeout)
+            if response.ok:
+                latency_tracker.record(key, time.monotonic() - started)
+            return response
+        
+        if deadline is None:
+            scopus_rate_limiter.acquire(key)
+        else:
+            if not scopus_rate_limiter.acquire(key, timeout=max(0.0, deadline - time.monotonic())):
+                raise HTTPException(status_code=504, detail="Scopus rate limit left no time before the search deadline")
+            # Time spent waiting for the token comes out of the request's budget
+            timeout = min(timeout, max(deadline - time.monotonic(), 0.001))
+        if settings.scopus_hedging_enabled:
+            return hedged_call(key, timed_get)
+        return timed_get()
+    
     def search(
         self,
         query: str,
         count: int = 25,
         start: int = 0,
-        sort: str = "-citedby-count"
+        sort: Optional[str] = "-citedby-count",
+        timeout: Optional[float] = None,
+        cursor: Optional[str] = None,
+        facets: Optional[str] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Execute single search request to Scopus API"""
+        """
+        Execute single search request to Scopus API
+        Passing `cursor` ("*" for the first page) uses cursor paging instead of `start`.
+        `facets` is passed through as the Scopus `facets` parameter.
+        `sort=None` leaves the order to Scopus (for requests that fetch no records).
+        `deadline` (time.monotonic()) also bounds the wait for a rate-limit token.
+        """
         headers = {
             'X-ELS-APIKey': self.api_key,
             'Accept': 'application/json'
@@ -66,22 +211,36 @@ class ScopusService:
         
         params = {
             'query': query,
-            'count': min(count, self.max_per_page),
+            'count': min(count, self.page_size),
             'start': start,
             'sort': sort,
-            'view': 'STANDARD'
+            'view': self.view
         }
+        if sort is None:
+            params.pop('sort')
+        if cursor is not None:
+            params.pop('start')
+            params['cursor'] = cursor
+        if facets is not None:
+            params['facets'] = facets
         
         try:
-            response = requests.get(
-                self.base_url, 
-                headers=headers, 
-                params=params, 
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response.json()
+            while True:
+                response = self._get(headers, params, timeout or self.timeout, deadline)
+                requested = params['count']
+                if requested > self.max_per_page and self._is_entitlement_error(response):
+                    smaller = self._downgrade_page_size(requested)
+                    if smaller is not None:
+                        params['count'] = smaller
+                        continue
+                response.raise_for_status()
+                if not self._page_size_confirmed and requested == self.page_size:
+                    # A full-size page went through - the entitlement is confirmed
+                    self._remember_page_size(requested)
+                return response.json()
         except requests.exceptions.RequestException as e:
+            if getattr(e.response, 'status_code', None) == 429:
+                raise HTTPException(status_code=429, detail="Scopus API quota exceeded for this API key")
             raise HTTPException(
                 status_code=500, 
                 detail=f"Scopus API error: {str(e)}"
@@ -130,22 +289,48 @@ class ScopusService:
             'pdf_url': pdf_url
         }
     
-    def fetch_multiple_pages(
+    def iter_pages(
         self,
         query: str,
         total_limit: int,
         sort: str = "-citedby-count",
-        start: int = 0
-    ) -> tuple[List[Dict], int]:
-        """Fetch multiple pages to get more results (supports offsets for pagination)"""
-        all_entries: List[Dict] = []
+        start: int = 0,
+        cancel_event: Optional[threading.Event] = None,
+        deadline: Optional[float] = None
+    ) -> Iterator[tuple[List[Dict], int]]:
+        """
+        Lazily fetch pages, yielding (entries, total_available) as each one arrives
+        
+        `deadline` is an absolute time.monotonic() value bounding the whole fetch.
+        When it passes, or a page fails, after some pages were yielded,
+        FetchInterrupted is raised; the caller owns the entries it already received.
+        """
         current_start = max(start, 0)
         remaining = max(total_limit, 0)
         total_available: Optional[int] = None
 
         while remaining > 0:
-            count = min(self.max_per_page, remaining)
-            result = self.search(query, count=count, start=current_start, sort=sort)
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled()
+            count = min(self.page_size, remaining)
+            
+            page_timeout = None
+            if deadline is not None:
+                time_left = deadline - time.monotonic()
+                if time_left <= 0:
+                    self._interrupt("deadline", total_available, current_start)
+                page_timeout = min(self.timeout, time_left)
+            
+            try:
+                result = self.search(
+                    query, count=count, start=current_start, sort=sort, timeout=page_timeout, deadline=deadline
+                )
+            except HTTPException:
+                if deadline is None:
+                    raise
+                reason = "deadline" if time.monotonic() >= deadline else "error"
+                self._interrupt(reason, total_available, current_start)
+                raise
 
             if not result or 'search-results' not in result:
                 break
@@ -161,22 +346,112 @@ class ScopusService:
             if not entries:
                 break
 
-            all_entries.extend(entries)
             retrieved = len(entries)
+            yield entries[:remaining], total_available
             remaining -= retrieved
             current_start += retrieved
 
             if total_available is not None and current_start >= total_available:
                 break
 
-            if retrieved < count:
+            # The page may have been shrunk to the key's entitlement mid-request
+            if retrieved < min(count, self.page_size):
                 break
+    
+    def iter_cursor_pages(
+        self,
+        query: str,
+        total_limit: int,
+        sort: str = "-citedby-count",
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[tuple[List[Dict], int]]:
+        """
+        Like iter_pages, but pages with Scopus cursors so harvests can go past
+        the 5000-result `start` ceiling of the Search API
+        """
+        cursor = "*"
+        remaining = max(total_limit, 0)
+        total_available: Optional[int] = None
 
-        if total_available is None:
-            total_available = 0
+        while remaining > 0 and cursor:
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled()
+            count = min(self.page_size, remaining)
+            result = self.search(query, count=count, sort=sort, cursor=cursor)
+
+            search_results = (result or {}).get('search-results')
+            if not search_results:
+                break
+            if total_available is None:
+                try:
+                    total_available = int(search_results.get('opensearch:totalResults', 0))
+                except (TypeError, ValueError):
+                    total_available = 0
+
+            entries = search_results.get('entry', []) or []
+            if not entries or 'error' in entries[0]:
+                break
+
+            yield entries[:remaining], total_available
+            remaining -= len(entries)
+
+            next_cursor = (search_results.get('cursor') or {}).get('@next')
+            cursor = next_cursor if next_cursor != cursor else None
+    
+    def fetch_multiple_pages(
+        self,
+        query: str,
+        total_limit: int,
+        sort: str = "-citedby-count",
+        start: int = 0,
+        cancel_event: Optional[threading.Event] = None,
+        deadline: Optional[float] = None
+    ) -> tuple[List[Dict], int]:
+        """
+        Fetch multiple pages to get more results (supports offsets for pagination)
+        
+        With a `deadline`, FetchInterrupted carries the entries already fetched.
+        """
+        all_entries: List[Dict] = []
+        total_available = 0
+        try:
+            for entries, total_available in self.iter_pages(
+                query, total_limit, sort, start, cancel_event=cancel_event, deadline=deadline
+            ):
+                all_entries.extend(entries)
+        except FetchInterrupted as interrupted:
+            interrupted.entries = all_entries
+            raise
 
         return all_entries[:total_limit], total_available
     
+    @staticmethod
+    def _interrupt(reason: str, total_available: Optional[int], next_start: int) -> None:
+        """Stop a deadline-bound fetch: partial results if pages arrived, otherwise a gateway error"""
+        if total_available is not None:
+            raise FetchInterrupted(reason, [], total_available, next_start)
+        if reason == "deadline":
+            raise HTTPException(status_code=504, detail="Scopus API did not respond before the search deadline")
+    
+    @staticmethod
+    def cache_filters(
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        document_type: Optional[str] = None,
+        subject_areas: Optional[List[str]] = None,
+        sort_by: str = "-citedby-count",
+        page: int = 1
+    ) -> Dict[str, Any]:
+        """Filters that identify a cached search window"""
+        return {
+            "year_from": year_from,
+            "year_to": year_to,
+            "document_type": document_type,
+            "subject_areas": subject_areas,
+            "sort_by": sort_by,
+            "page": page
+        }
+    
     def search_papers(
         self,
         query: str,
@@ -187,11 +462,17 @@ class ScopusService:
         subject_areas: Optional[List[str]] = None,
         sort_by: str = "-citedby-count",
         page: int = 1,
-        use_cache: bool = True
+        use_cache: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+        deadline: Optional[float] = None,
+        offset: Optional[int] = None
     ) -> tuple[List[Dict], str, int]:
         """
         High-level search method with caching support
         Returns: (papers, full_query, total_available)
+        Raises FetchCancelled if `cancel_event` is set while pages are still being fetched,
+        and PartialSearchResults if `deadline` cuts the window short.
+        `offset` overrides the page-derived start index (used to resume partial searches).
         """
         # Build query with filters
         full_query = self.build_query(
@@ -202,17 +483,14 @@ class ScopusService:
             subject_areas=subject_areas
         )
         
+        # The cache is keyed by page, so explicit offsets bypass it
+        if offset is not None:
+            use_cache = False
+        
         # Check cache first if enabled
         if use_cache:
             from app.services.redis_service import redis_cache
-            filters = {
-                "year_from": year_from,
-                "year_to": year_to,
-                "document_type": document_type,
-                "subject_areas": subject_areas,
-                "sort_by": sort_by,
-                "page": page
-            }
+            filters = self.cache_filters(year_from, year_to, document_type, subject_areas, sort_by, page)
             cached_result = redis_cache.get_cached_search(query, limit, filters)
             if cached_result:
                 return (
@@ -222,13 +500,26 @@ class ScopusService:
                 )
         
         # Fetch entries
-        start_index = max(page - 1, 0) * limit
-        entries, total_available = self.fetch_multiple_pages(
-            full_query,
-            limit,
-            sort_by,
-            start=start_index
-        )
+        start_index = offset if offset is not None else max(page - 1, 0) * limit
+        try:
+            entries, total_available = self.fetch_multiple_pages(
+                full_query,
+                limit,
+                sort_by,
+                start=start_index,
+                cancel_event=cancel_event,
+                deadline=deadline
+            )
+        except FetchInterrupted as interrupted:
+            # Partial windows are returned to the caller but never cached
+            papers = [self.parse_entry(entry) for entry in interrupted.entries if 'error' not in entry]
+            raise PartialSearchResults(
+                interrupted.reason,
+                papers,
+                full_query,
+                interrupted.total_available,
+                interrupted.next_start
+            ) from interrupted
         
         # Parse results
         papers = [self.parse_entry(entry) for entry in entries if 'error' not in entry]
@@ -246,6 +537,75 @@ class ScopusService:
         
         return papers, full_query, total_available
     
+    def get_facets(self, query: str, use_cache: bool = True) -> tuple[int, Dict[str, Dict[str, int]]]:
+        """
+        Population-wide value counts for a query from the Scopus `facets` parameter
+        
+        A single `count=0` request returns the total result count and the
+        distributions in STATS_FACETS, so no records are transferred.
+        """
+        from app.services.redis_service import redis_cache
+        
+        spec = ";".join(f"{name}({options})" for name, options in STATS_FACETS.items())
+        cache_key = redis_cache.search_cache_key(query, 0, {"facets": spec})
+        if use_cache:
+            cached = redis_cache.get(cache_key)
+            if cached:
+                return cached["total_available"], cached["facets"]
+        
+        # No records are fetched, so no sort is sent
+        result = self.search(query, count=0, sort=None, facets=spec)
+        search_results = result.get('search-results', {})
+        try:
+            total_available = int(search_results.get('opensearch:totalResults', 0))
+        except (TypeError, ValueError):
+            total_available = 0
+        
+        # Scopus collapses single-element lists into objects
+        raw_facets = search_results.get('facet') or []
+        if isinstance(raw_facets, dict):
+            raw_facets = [raw_facets]
+        
+        facets: Dict[str, Dict[str, int]] = {}
+        for facet in raw_facets:
+            categories = facet.get('category') or []
+            if isinstance(categories, dict):
+                categories = [categories]
+            counts = {}
+            for category in categories:
+                label = category.get('name') or category.get('label') or category.get('value')
+                try:
+                    counts[str(label)] = int(category.get('hitCount', 0))
+                except (TypeError, ValueError):
+                    continue
+            facets[facet.get('name') or facet.get('attribute', 'unknown')] = counts
+        
+        if use_cache:
+            redis_cache.set(cache_key, {"total_available": total_available, "facets": facets})
+        return total_available, facets
+    
+    def search_highly_cited(self, query: str, min_citations: int, limit: int) -> tuple[List[Dict], int]:
+        """
+        Papers with at least `min_citations`, most cited first
+        
+        Pages are requested in citation order, so paging stops at the first
+        entry below the threshold instead of fetching `limit` papers and
+        filtering them afterwards.
+        """
+        papers: List[Dict] = []
+        total_available = 0
+        pages = self.iter_pages(query, limit, sort="-citedby-count")
+        for entries, total_available in pages:
+            for entry in entries:
+                if 'error' in entry:
+                    continue
+                paper = self.parse_entry(entry)
+                if paper['cited_by'] < min_citations:
+                    pages.close()
+                    return papers, total_available
+                papers.append(paper)
+        return papers, total_available
+    
     def search_by_author(self, author_name: str, limit: int = 25) -> List[Dict]:
         """Search papers by author name"""
         query = f"AUTHOR-NAME({author_name})"
@@ -0,0 +1,148 @@
+"""
+Single-pass statistics over streamed papers.
+
+Papers are folded in page by page and never kept: citation moments use
+Welford's update, quantiles and the h/g-index come from a histogram of
+citation values, and top venues from a Space-Saving heavy-hitters sketch.
+Memory is bounded by the number of distinct citation values, years and the
+sketch capacity, not by the number of papers.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k sketch (Metwally et al.)
+
+    Counts are exact while fewer than `capacity` distinct items were seen;
+    after that each count overestimates by at most N / capacity.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, item: str, weight: int = 1) -> None:
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+        else:
+            # Replace the smallest counter; the newcomer inherits its count
+            smallest = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(smallest)
+            self.counts[item] = floor + weight
+
+    def top(self, k: int) -> dict[str, int]:
+        return dict(sorted(self.counts.items(), key=lambda item: -item[1])[:k])
+
+
+class StatsAccumulator:
+    """Incremental citation, year and venue statistics."""
+
+    def __init__(self, venue_capacity: int = 500) -> None:
+        self.count = 0
+        self.total_citations = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min_citations: Optional[int] = None
+        self.max_citations: Optional[int] = None
+        self.citations: Counter[int] = Counter()
+        self.years: Counter[str] = Counter()
+        self.venues = SpaceSaving(venue_capacity)
+
+    def add(self, paper: dict) -> None:
+        cited_by = max(int(paper.get("cited_by") or 0), 0)
+
+        # Welford's online mean/variance
+        self.count += 1
+        delta = cited_by - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (cited_by - self.mean)
+
+        self.total_citations += cited_by
+        self.min_citations = cited_by if self.min_citations is None else min(self.min_citations, cited_by)
+        self.max_citations = cited_by if self.max_citations is None else max(self.max_citations, cited_by)
+        self.citations[cited_by] += 1
+        self.years[str(paper.get("year") or "N/A")] += 1
+        self.venues.add(paper.get("publication") or "N/A")
+
+    def update(self, papers: Iterable[dict]) -> None:
+        for paper in papers:
+            self.add(paper)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def _descending(self) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct citation values (descending) and how many papers have each"""
+        values = np.array(sorted(self.citations, reverse=True), dtype=np.int64)
+        counts = np.array([self.citations[value] for value in values], dtype=np.int64)
+        return values, counts
+
+    def quantile(self, q: float) -> int:
+        """Exact nearest-rank quantile; 0.5 gives the upper median"""
+        if not self.count:
+            return 0
+        values = np.array(sorted(self.citations), dtype=np.int64)
+        ranks = np.cumsum([self.citations[value] for value in values])
+        target = min(int(q * self.count), self.count - 1)
+        return int(values[np.searchsorted(ranks, target, side="right")])
+
+    def h_index(self) -> int:
+        """Largest h such that h papers have at least h citations each"""
+        if not self.count:
+            return 0
+        values, counts = self._descending()
+        return int(np.minimum(values, np.cumsum(counts)).max())
+
+    def g_index(self) -> int:
+        """Largest g such that the top g papers have at least g^2 citations together"""
+        if not self.count:
+            return 0
+        values, counts = self._descending()
+        papers_before = np.cumsum(counts) - counts
+        citations_before = np.cumsum(values * counts) - values * counts
+
+        # Within a group of equal values v the top-g sum is C + g*v with
+        # C = citations_before - papers_before*v; solve g^2 <= C + g*v
+        offset = (citations_before - papers_before * values).astype(np.float64)
+        roots = np.floor((values + np.sqrt(values.astype(np.float64) ** 2 + 4 * offset)) / 2).astype(np.int64)
+        candidates = np.minimum(roots, papers_before + counts)
+        candidates = candidates[candidates > papers_before]
+        return int(candidates.max()) if candidates.size else 0
+
+    def year_range(self) -> str:
+        known = sorted(year for year in self.years if year.isdigit())
+        return f"{known[0]} - {known[-1]}" if known else "N/A"
+
+    def summary(self) -> dict:
+        return {
+            "total_papers": self.count,
+            "total_citations": self.total_citations,
+            "avg_citations": self.mean,
+            "median_citations": self.quantile(0.5),
+            "max_citations": self.max_citations or 0,
+            "min_citations": self.min_citations or 0,
+            "std_citations": round(self.std, 4),
+            "citation_percentiles": {
+                f"p{int(q * 100)}": self.quantile(q) for q in (0.25, 0.75, 0.9, 0.99)
+            },
+            "h_index": self.h_index(),
+            "g_index": self.g_index(),
+            "year_range": self.year_range(),
+            "papers_per_year": dict(self.years),
+            "top_journals": self.venues.top(10),
+        }
@@ -0,0 +1,17 @@
+"""
+Background job worker - consumes the Redis job queue
+Run with: python -m app.worker (requires JOB_BACKEND=redis)
+"""
+
+from app.core.config import settings
+from app.services.job_service import job_manager
+
+
+def main():
+    """Main entry point for the job worker"""
+    print(f"🛠️  Starting {settings.app_name} job worker")
+    job_manager.work_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Baseline schema (users, api_keys, wishlists as created by create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "api_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("key_name", sa.String(100), nullable=False),
+        sa.Column("api_key", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_api_keys_id", "api_keys", ["id"])
+
+    op.create_table(
+        "wishlists",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(500), nullable=False),
+        sa.Column("authors", sa.String(500)),
+        sa.Column("year", sa.String(10)),
+        sa.Column("publication", sa.String(300)),
+        sa.Column("cited_by", sa.Integer()),
+        sa.Column("doi", sa.String(100)),
+        sa.Column("eid", sa.String(100)),
+        sa.Column("scopus_url", sa.Text()),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_wishlists_id", "wishlists", ["id"])
+    op.create_index("ix_wishlists_eid", "wishlists", ["eid"])
+
+
+def downgrade() -> None:
+    op.drop_table("wishlists")
+    op.drop_table("api_keys")
+    op.drop_table("users")
@@ -0,0 +1,65 @@
+"""Composite indexes for the per-user lookups, unique (user_id, eid)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Active key lookup on every search
+    op.create_index("ix_api_keys_user_id_is_active", "api_keys", ["user_id", "is_active"])
+
+    merge_duplicate_wishlist_rows()
+    # Wishlist check/add by EID; NULL EIDs stay unconstrained
+    op.create_index("uq_wishlists_user_id_eid", "wishlists", ["user_id", "eid"], unique=True)
+    # Wishlist listing, newest first
+    op.create_index("ix_wishlists_user_id_created_at", "wishlists", ["user_id", "created_at"])
+
+
+def merge_duplicate_wishlist_rows() -> None:
+    """
+    Older rows may hold the same paper twice (the duplicate check was a
+    separate SELECT). Keep the first copy of each (user_id, eid), carrying
+    over the notes written on the later copies, before enforcing uniqueness.
+    """
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT w.id, w.user_id, w.eid, w.notes FROM wishlists w JOIN ("
+        "SELECT user_id, eid FROM wishlists WHERE eid IS NOT NULL "
+        "GROUP BY user_id, eid HAVING COUNT(*) > 1) d "
+        "ON w.user_id = d.user_id AND w.eid = d.eid ORDER BY w.id"
+    )).fetchall()
+    groups: dict[tuple, list] = {}
+    for row in rows:
+        groups.setdefault((row.user_id, row.eid), []).append(row)
+
+    removed = []
+    for copies in groups.values():
+        keep, duplicates = copies[0], copies[1:]
+        notes = []
+        for copy in copies:
+            if copy.notes and copy.notes not in notes:
+                notes.append(copy.notes)
+        merged = "\n\n".join(notes) or None
+        if merged != keep.notes:
+            bind.execute(sa.text("UPDATE wishlists SET notes = :notes WHERE id = :id"), {"notes": merged, "id": keep.id})
+        removed.extend(copy.id for copy in duplicates)
+
+    if removed:
+        bind.execute(sa.text("DELETE FROM wishlists WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)), {"ids": removed})
+        print(f"⚠️  Removed {len(removed)} duplicate wishlist rows (notes merged into the kept copy)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wishlists_user_id_created_at", table_name="wishlists")
+    op.drop_index("uq_wishlists_user_id_eid", table_name="wishlists")
+    op.drop_index("ix_api_keys_user_id_is_active", table_name="api_keys")
@@ -0,0 +1,25 @@
+"""Extend the wishlist listing index with id for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pages are ordered and sought by (created_at, id); with id in the index
+    # ties on created_at need no sort either
+    op.create_index("ix_wishlists_user_id_created_at_id", "wishlists", ["user_id", "created_at", "id"])
+    op.drop_index("ix_wishlists_user_id_created_at", table_name="wishlists")
+
+
+def downgrade() -> None:
+    op.create_index("ix_wishlists_user_id_created_at", "wishlists", ["user_id", "created_at"])
+    op.drop_index("ix_wishlists_user_id_created_at_id", table_name="wishlists")
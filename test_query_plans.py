@@ -0,0 +1,131 @@
+"""
+Query-plan regression test for the hot per-user lookups
+
+Builds a throwaway SQLite database through the Alembic migrations and checks
+with EXPLAIN QUERY PLAN that the search, wishlist check and (keyset paged)
+wishlist listing queries are answered from their composite indexes.
+
+Run with `python test_query_plans.py` or `pytest test_query_plans.py`.
+"""
+import os
+import tempfile
+from datetime import datetime
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select, text
+
+from app.api.wishlist import _encode_cursor, wishlist_page_statement
+from app.db.database import ALEMBIC_INI
+from app.db.models import ApiKey, Wishlist
+
+
+def migrated_engine(revision="head"):
+    """Fresh SQLite database migrated to `revision`"""
+    path = os.path.join(tempfile.mkdtemp(), "plans.db")
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade(engine, revision)
+    return engine
+
+
+def upgrade(engine, revision):
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+def query_plan(engine, statement):
+    """EXPLAIN QUERY PLAN details for a statement, joined into one string"""
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def seed(engine, users=20, rows_per_user=50):
+    """Enough rows and statistics that the planner has a real choice"""
+    with engine.begin() as connection:
+        for user_id in range(1, users + 1):
+            connection.execute(
+                text("INSERT INTO users (id, email, hashed_password, is_active) VALUES (:id, :email, 'x', 1)"),
+                {"id": user_id, "email": f"user{user_id}@example.com"}
+            )
+            connection.execute(
+                text("INSERT INTO api_keys (user_id, key_name, api_key, is_active) VALUES (:user_id, 'key', 'x', 1)"),
+                {"user_id": user_id}
+            )
+            connection.execute(
+                text("INSERT INTO wishlists (user_id, title, eid) VALUES (:user_id, 'Paper', :eid)"),
+                [{"user_id": user_id, "eid": f"2-s2.0-{user_id}-{i}"} for i in range(rows_per_user)]
+            )
+        connection.execute(text("ANALYZE"))
+
+
+def test_active_api_key_lookup_uses_index():
+    engine = migrated_engine()
+    seed(engine)
+    plan = query_plan(engine, select(ApiKey.api_key).where(
+        ApiKey.user_id == 1,
+        ApiKey.is_active == True
+    ).limit(1))
+    print(f"Active key:     {plan}")
+    assert "ix_api_keys_user_id_is_active" in plan
+
+
+def test_wishlist_check_uses_unique_index():
+    engine = migrated_engine()
+    seed(engine)
+    plan = query_plan(engine, select(Wishlist.id).where(
+        Wishlist.user_id == 1,
+        Wishlist.eid == "2-s2.0-1-7"
+    ))
+    print(f"Wishlist check: {plan}")
+    assert "uq_wishlists_user_id_eid" in plan
+
+
+def test_wishlist_listing_uses_index_without_sort():
+    engine = migrated_engine()
+    seed(engine)
+    columns = [Wishlist.id, Wishlist.created_at, Wishlist.title]
+    first = query_plan(engine, wishlist_page_statement(1, columns, None, 51))
+    print(f"Wishlist list:  {first}")
+    assert "ix_wishlists_user_id_created_at_id" in first
+    assert "TEMP B-TREE" not in first
+
+    cursor = _encode_cursor(datetime(2026, 1, 1), 25)
+    later = query_plan(engine, wishlist_page_statement(1, columns, cursor, 51))
+    print(f"Next page:      {later}")
+    assert "ix_wishlists_user_id_created_at_id" in later
+    assert "TEMP B-TREE" not in later
+
+
+def test_index_migration_removes_duplicate_papers():
+    engine = migrated_engine("0001")
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        connection.execute(
+            text("INSERT INTO wishlists (user_id, title, eid, notes) VALUES (1, :title, :eid, :notes)"),
+            [
+                {"title": "First copy", "eid": "2-s2.0-1", "notes": None},
+                {"title": "Second copy", "eid": "2-s2.0-1", "notes": "Read section 3"},
+                {"title": "Third copy", "eid": "2-s2.0-1", "notes": "Cite in chapter 2"},
+                {"title": "No EID", "eid": None, "notes": None},
+                {"title": "No EID again", "eid": None, "notes": None},
+            ]
+        )
+    upgrade(engine, "head")
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT title, notes FROM wishlists ORDER BY id")).fetchall()
+    print(f"Kept after dedup: {rows}")
+    assert [row.title for row in rows] == ["First copy", "No EID", "No EID again"]
+    assert rows[0].notes == "Read section 3\n\nCite in chapter 2"
+
+
+if __name__ == "__main__":
+    print("=== Query plan checks ===\n")
+    test_active_api_key_lookup_uses_index()
+    test_wishlist_check_uses_unique_index()
+    test_wishlist_listing_uses_index_without_sort()
+    test_index_migration_removes_duplicate_papers()
+    print("\n=== All query plans use their indexes ===")